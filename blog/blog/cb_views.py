@@ -1,5 +1,4 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
 from django.http import HttpResponseRedirect, Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy, reverse
@@ -7,6 +6,7 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 
 from blog.forms import CommentForm, BlogForm
 from blog.models import Blog, Comment
+from blog.search import search_blogs
 
 
 class BlogListView(ListView):
@@ -23,10 +23,7 @@ class BlogListView(ListView):
         q = self.request.GET.get("q")
 
         if q:
-            queryset = queryset.filter(
-                Q(title__icontains=q) |
-                Q(content__icontains=q)
-            )
+            queryset = search_blogs(queryset, q)
 
         return queryset # blog_list.html에 object_list로 들어가고, 페이지 네이션 쪽엔 page_obj로 찾아서 들어가게 됨.
 
@@ -0,0 +1,69 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.models import Blog
+from blog.tasks import rebuild_thumbnails
+from utils.tasks import init_worker
+
+
+# python manage.py rebuild_thumbnails [--workers 4] [--missing] [--resume]
+# 전체 블로그의 썸네일과 image_hash를 --chunk-size개씩 나눠서 여러 프로세스로 다시 만듦
+# --missing : 썸네일이나 이미지 해시가 없는 블로그만
+# 진행 상황은 --checkpoint 파일에 "여기까지는 모두 끝난 pk"로 저장
+# => 중간에 멈춰도 --resume 으로 그 다음 pk부터 이어서 실행
+# chunk는 끝나는 순서가 제각각이라 앞에서부터 연속으로 끝난 chunk까지만 checkpoint를 올림
+class Command(BaseCommand):
+    help = "블로그 썸네일을 병렬로 다시 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument("--chunk-size", type=int, default=100)
+        parser.add_argument("--missing", action="store_true")
+        parser.add_argument("--resume", action="store_true")
+        parser.add_argument("--checkpoint", default=".rebuild_thumbnails.checkpoint")
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options["checkpoint"])
+        last_pk = 0
+        if options["resume"] and checkpoint.exists():
+            last_pk = int(checkpoint.read_text().strip() or 0)
+            self.stdout.write(f"{last_pk} 다음부터 이어서 실행합니다.")
+
+        blogs = Blog.objects.filter(pk__gt=last_pk).exclude(image="")
+        if options["missing"]:
+            blogs = blogs.filter(Q(thumbnail="") | Q(thumbnail__isnull=True) | Q(image_hash=""))
+        pks = list(blogs.order_by("pk").values_list("pk", flat=True))
+
+        chunk_size = options["chunk_size"]
+        chunks = [pks[i:i + chunk_size] for i in range(0, len(pks), chunk_size)]
+        done = [False] * len(chunks)
+        next_index = 0 # 아직 안 끝난 가장 앞의 chunk
+        rebuilt = 0
+        failed = []
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        ) as executor:
+            futures = {executor.submit(rebuild_thumbnails, chunk): index for index, chunk in enumerate(chunks)}
+
+            for future in as_completed(futures):
+                chunk_rebuilt, chunk_failed = future.result()
+                rebuilt += chunk_rebuilt
+                failed += chunk_failed
+                done[futures[future]] = True
+
+                while next_index < len(chunks) and done[next_index]:
+                    next_index += 1
+                if next_index:
+                    checkpoint.write_text(str(chunks[next_index - 1][-1]))
+                self.stdout.write(f"~ {rebuilt}/{len(pks)}")
+
+        for pk in failed:
+            self.stderr.write(f"{pk} : 원본 이미지를 열 수 없습니다.")
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt}개 블로그의 썸네일을 다시 만들었습니다."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:53
+
+import re
+from html import unescape
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+# 마이그레이션 작성 시점의 utils.search.to_search_text, html_to_text 복사본
+# 앱 코드를 import 하면 나중에 그 함수를 고쳤을 때 예전 마이그레이션의 결과가 바뀌거나 깨지므로 그대로 고정
+HANGUL = "가-힣"
+TOKEN_RE = re.compile(rf"[{HANGUL}]+|[^\W{HANGUL}]+")
+
+
+def to_search_text(text):
+    words = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if "가" <= token[0] <= "힣" and len(token) > 1:
+            words.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            words.append(token)
+    return " ".join(words)
+
+
+def html_to_text(html):
+    return unescape(strip_tags(html.replace("<", " <"))).replace("\xa0", " ")
+
+
+# 이미 작성된 블로그들을 색인
+def index_blogs(apps, schema_editor):
+    Blog = apps.get_model("blog", "Blog")
+    cursor = schema_editor.connection.cursor()
+    for pk, title, content in Blog.objects.values_list("pk", "title", "content").iterator():
+        cursor.execute(
+            "INSERT INTO blog_fts (rowid, title, body) VALUES (%s, %s, %s)",
+            [pk, to_search_text(title), to_search_text(html_to_text(content))],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_blog_thumbnail'),
+    ]
+
+    operations = [
+        # unicode61 : 유니코드 단어 단위 토크나이저, remove_diacritics 2 : é => e 처럼 악센트 무시
+        migrations.RunSQL(
+            "CREATE VIRTUAL TABLE blog_fts USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')",
+            "DROP TABLE blog_fts",
+        ),
+        migrations.RunPython(index_blogs, migrations.RunPython.noop),
+    ]
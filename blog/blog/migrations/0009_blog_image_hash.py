@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_blog_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='이미지 해시'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:07
+
+import utils.images
+import utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_blog_image_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blog',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=utils.storage.media_storage, upload_to='blog/%Y/%m/%d', validators=[utils.images.validate_image_pixels], verbose_name='이미지'),
+        ),
+    ]
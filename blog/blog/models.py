@@ -1,12 +1,18 @@
+from functools import partial
 from io import BytesIO
 from pathlib import Path
 
-from PIL import Image
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.urls import reverse
 
+from utils.files import file_sha256
+from utils.images import open_image, validate_image_pixels
 from utils.models import TimeStampModel
+from utils.storage import media_storage
 
 User = get_user_model() # get_user_model() : 장고에 설정된 User를 가져오는 함수
 
@@ -35,8 +41,12 @@ class Blog(TimeStampModel):
     content = models.TextField("본문")
     author = models.ForeignKey(User, on_delete=models.CASCADE)
 
-    image = models.ImageField("이미지", null=True, blank=True, upload_to="blog/%Y/%m/%d") # "blog/%Y-%m-%d"
+    # storage=media_storage : 같은 사진은 파일 하나로 저장하는 내용 기반 저장소 (utils/storage.py)
+    image = models.ImageField("이미지", null=True, blank=True, upload_to="blog/%Y/%m/%d",
+                              storage=media_storage, validators=[validate_image_pixels]) # "blog/%Y-%m-%d"
     thumbnail = models.ImageField("썸네일", null=True, blank=True, upload_to="blog/%Y/%m/%d/thumbnail")
+    # 썸네일을 만든 원본 이미지 내용의 sha256 => 같으면 제목/카테고리만 수정한 저장에서 썸네일을 다시 만들지 않음
+    image_hash = models.CharField("이미지 해시", max_length=64, blank=True, default="")
     # ImageField
     # 2025/9/30일 -> media/blog/2025/9/30/이미지파일.jpg
     # 기본적으로 varchar로 되어있고 FileField와 같지만 이미지인지 검증해서 이미지만 업로드 하게 되어있음.
@@ -64,11 +74,58 @@ class Blog(TimeStampModel):
             return self.image.url
         return None
 
+    # settings.BLOG_THUMBNAIL_ASYNC = True : 저장이 커밋된 다음 백그라운드(blog/tasks.py)에서 썸네일 생성
+    # False : 예전처럼 저장하면서 바로 생성
+    # 원본 이미지 내용(image_hash)이 그대로고 썸네일도 있으면 다시 만들지 않음
     def save(self, *args, **kwargs):
+        replaced_image = self.get_replaced_image()
+        self.save_with_thumbnail(*args, **kwargs)
+
+        # 이미지를 바꾸거나 지운 경우 예전 이미지 파일 삭제 (내용 기반 저장소에서는 참조 수 -1)
+        if replaced_image:
+            transaction.on_commit(partial(self.image.storage.delete, replaced_image))
+
+    # 새 파일을 올리거나 이미지를 지우고 저장하는 경우 DB에 저장되어 있던 예전 이미지 이름
+    def get_replaced_image(self):
+        if self.pk is None or (self.image and self.image._committed):
+            return None
+        return Blog.objects.filter(pk=self.pk).values_list("image", flat=True).first() or None
+
+    def save_with_thumbnail(self, *args, **kwargs):
         if not self.image:
+            self.image_hash = ""
             return super().save(*args, **kwargs)
 
-        image = Image.open(self.image)
+        # 새로 업로드 된 파일일 때만 해시 계산 (이미 저장된 파일은 저장해둔 해시 사용)
+        image_hash = self.image_hash
+        if not self.image._committed or not image_hash:
+            image_hash = file_sha256(self.image)
+
+        if image_hash == self.image_hash and self.thumbnail:
+            return super().save(*args, **kwargs)
+
+        self.image_hash = image_hash
+        old_thumbnail = self.thumbnail.name if self.thumbnail else None
+
+        if settings.BLOG_THUMBNAIL_ASYNC:
+            # 새 썸네일이 만들어지기 전까지는 원본 이미지를 보여주도록 비워둠
+            self.thumbnail = None
+            super().save(*args, **kwargs)
+
+            from blog.tasks import make_thumbnail
+            from utils.tasks import enqueue
+            transaction.on_commit(partial(enqueue, make_thumbnail, self.pk))
+        else:
+            self.make_thumbnail()
+            super().save(*args, **kwargs)
+
+        # 더 이상 쓰지 않는 예전 썸네일 파일 삭제 (롤백되면 그대로 둠)
+        if old_thumbnail and old_thumbnail != self.thumbnail.name:
+            transaction.on_commit(partial(self.thumbnail.storage.delete, old_thumbnail))
+
+    def make_thumbnail(self):
+        # 300px 썸네일에 필요한 만큼만 줄여서 디코딩 (utils/images.py)
+        image = open_image(self.image, (300, 300))
         image.thumbnail((300, 300))
         image_path = Path(self.image.name)
 
@@ -83,7 +140,7 @@ class Blog(TimeStampModel):
         elif thumbnail_extension == ".png":
             file_type = "PNG"
         else:
-            return super().save(*args, **kwargs)
+            return
 
         temp_thumb = BytesIO()
         image.save(temp_thumb, file_type)
@@ -91,13 +148,32 @@ class Blog(TimeStampModel):
 
         self.thumbnail.save(thumbnail_filename, temp_thumb, save=False)
         temp_thumb.close()
-        return super().save(*args, **kwargs)
 
 
     class Meta:
         verbose_name = "블로그"
         verbose_name_plural = "블로그 목록"
 
+# 전문 검색 색인(blog_fts) 동기화 => blog/search.py
+@receiver(post_save, sender=Blog)
+def blog_post_save(sender, instance, **kwargs):
+    from blog.search import index_blog
+    index_blog(instance)
+
+
+@receiver(post_delete, sender=Blog)
+def blog_post_delete(sender, instance, **kwargs):
+    from blog.search import unindex_blog
+    unindex_blog(instance.pk)
+
+
+# 블로그가 삭제되면 이미지, 썸네일 파일도 삭제 (커밋된 다음에)
+@receiver(post_delete, sender=Blog)
+def blog_delete_files(sender, instance, **kwargs):
+    for field_file in (instance.image, instance.thumbnail):
+        if field_file:
+            transaction.on_commit(partial(field_file.storage.delete, field_file.name))
+
 # category update ORM
 # Blog.objects.filter(category="").update(category="free")
 
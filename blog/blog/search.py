@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Case, When, IntegerField
+
+from utils.search import to_search_text, to_match_query, html_to_text
+
+# 블로그 전문 검색 (SQLite FTS5)
+# blog_fts : rowid = 블로그 id, title / body = 한글 bigram 색인 텍스트 (migrations/0008_blog_fts.py)
+# body는 Summernote HTML에서 태그를 걷어낸 텍스트만 색인 => <p style=...> 같은 태그/속성 이름에 걸리지 않음
+# Blog가 저장/삭제될 때 시그널로 같이 반영 (blog/models.py)
+
+BLOG_SEARCH_LIMIT = 500 # 관련도 순으로 앞에서부터 이만큼만 페이지네이션
+TITLE_WEIGHT = 10.0 # bm25 컬럼 가중치 : 제목에서 찾은 결과를 본문보다 위로
+
+
+def index_blog(blog):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_fts WHERE rowid = %s", [blog.pk])
+        cursor.execute(
+            "INSERT INTO blog_fts (rowid, title, body) VALUES (%s, %s, %s)",
+            [blog.pk, to_search_text(blog.title), to_search_text(html_to_text(blog.content))],
+        )
+
+
+def unindex_blog(blog_pk):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_fts WHERE rowid = %s", [blog_pk])
+
+
+# bm25 : 값이 작을수록 관련도가 높음
+def search_blog_ids(q, limit=BLOG_SEARCH_LIMIT):
+    match_query = to_match_query(q)
+    if not match_query:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM blog_fts WHERE blog_fts MATCH %s ORDER BY bm25(blog_fts, %s, 1.0) LIMIT %s",
+            [match_query, TITLE_WEIGHT, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+# BlogListView, blog_list 에서 같이 사용
+# settings.BLOG_FULLTEXT_SEARCH = False 면 예전처럼 title/content icontains 검색
+def search_blogs(queryset, q):
+    if not settings.BLOG_FULLTEXT_SEARCH:
+        return queryset.filter(
+            Q(title__icontains=q) |
+            Q(content__icontains=q)
+        )
+
+    blog_ids = search_blog_ids(q)
+    if not blog_ids:
+        return queryset.none()
+
+    # FTS에서 받은 관련도 순서를 그대로 ORDER BY로 (CASE id WHEN .. THEN 0 WHEN .. THEN 1 ...)
+    ranking = Case(
+        *[When(pk=pk, then=rank) for rank, pk in enumerate(blog_ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=blog_ids).order_by(ranking)
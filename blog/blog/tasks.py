@@ -0,0 +1,60 @@
+from django.core.exceptions import ValidationError
+
+# 블로그 썸네일 백그라운드 작업 : 저장이 커밋된 다음 utils/tasks.py 의 enqueue 로 실행
+#
+# 큰 이미지를 Pillow로 열고 줄이고 다시 인코딩하는 작업은 수 초가 걸릴 수 있어서
+# settings.TASKS_WORKERS 가 있으면 요청(작성/수정) 안에서 하지 않고 프로세스 풀로 넘김
+# => 요청은 바로 응답, 썸네일이 만들어지기 전까지는 get_thumbnail_image_url이 원본 이미지를 보여줌
+
+
+# 워커 프로세스에서 실행
+# 썸네일을 만드는 동안 이미지가 다시 바뀌었으면(다른 요청이 수정) 예전 이미지의 썸네일은 저장하지 않고
+# 방금 저장한 파일을 지움 (내용 기반 저장소에서는 참조 수 -1)
+# save() 대신 update() => Blog.save(썸네일 처리, 검색 색인)를 다시 타지 않음
+def make_thumbnail(blog_pk):
+    from blog.models import Blog
+
+    blog = Blog.objects.filter(pk=blog_pk).first()
+    if blog is None or not blog.image:
+        return
+
+    blog.make_thumbnail()
+    if blog.thumbnail:
+        updated = Blog.objects.filter(pk=blog_pk, image=blog.image.name).update(thumbnail=blog.thumbnail.name)
+        if not updated:
+            blog.thumbnail.storage.delete(blog.thumbnail.name)
+
+
+# rebuild_thumbnails 커맨드의 워커 프로세스에서 실행 : blog_pks 의 썸네일/이미지 해시를 다시 만듦
+# 만드는 동안 이미지가 바뀌었으면(다른 요청이 수정) 그 블로그는 건너뜀 => 방금 저장한 썸네일만 지우고 예전 썸네일은 그대로
+# 반환값 : (다시 만든 수, 실패한 pk 리스트)
+def rebuild_thumbnails(blog_pks):
+    from blog.models import Blog
+    from utils.files import file_sha256
+
+    rebuilt = 0
+    failed = []
+    for blog in Blog.objects.filter(pk__in=blog_pks).exclude(image=""):
+        old_thumbnail = blog.thumbnail.name if blog.thumbnail else None
+        blog.thumbnail = None # make_thumbnail 이 새 파일을 저장했는지 구분 (지원하지 않는 형식이면 저장하지 않음)
+        try:
+            image_hash = file_sha256(blog.image)
+            blog.make_thumbnail()
+        except (OSError, ValueError, ValidationError): # 원본 파일이 없거나 이미지가 아닌 경우, 화소 수 초과
+            failed.append(blog.pk)
+            continue
+
+        new_thumbnail = blog.thumbnail.name if blog.thumbnail else None
+        updated = Blog.objects.filter(pk=blog.pk, image=blog.image.name).update(
+            thumbnail=new_thumbnail or old_thumbnail, image_hash=image_hash,
+        )
+        if not updated:
+            if new_thumbnail:
+                blog.thumbnail.storage.delete(new_thumbnail)
+            continue
+
+        if new_thumbnail and old_thumbnail and old_thumbnail != new_thumbnail:
+            blog.thumbnail.storage.delete(old_thumbnail)
+        rebuilt += 1
+
+    return rebuilt, failed
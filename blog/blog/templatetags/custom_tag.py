@@ -0,0 +1,12 @@
+from django import template
+
+from utils import resize
+
+register = template.Library()
+
+
+# {% resize_url blog.image 1200 %} => 너비 1200에 맞춘 이미지의 서명된 주소 (utils/resize.py)
+# width, height 를 모두 주면 그 크기로 가운데를 잘라냄
+@register.simple_tag()
+def resize_url(field_file, width, height=0):
+    return resize.resize_url(field_file.name, width, height)
@@ -1,6 +1,5 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
@@ -8,6 +7,7 @@ from django.views.decorators.http import require_http_methods
 
 from blog.forms import BlogForm
 from blog.models import Blog
+from blog.search import search_blogs
 
 # def blog_list(request):
 #     blogs = Blog.objects.all().order_by("-created_at")
@@ -30,10 +30,7 @@ def blog_list(request):
 
     q = request.GET.get("q")
     if q:
-        blogs = blogs.filter(
-            Q(title__icontains=q) |
-            Q(content__icontains=q)
-        )
+        blogs = search_blogs(blogs, q)
 
         # blogs = blogs.filter(content__icontains=q)
 
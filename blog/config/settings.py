@@ -150,6 +150,29 @@ STATIC_ROOT = BASE_DIR / ".static_root"
 # media
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# True : 업로드 이미지를 내용(sha256) 기준 경로에 저장하고 같은 파일은 공유 (utils/storage.py)
+MEDIA_CONTENT_ADDRESSED = True
+# 업로드를 받는 동안 sha256을 계산하는 핸들러 (기본 핸들러와 같은 순서 : 메모리 => 임시 파일)
+FILE_UPLOAD_HANDLERS = [
+    "utils.upload_handlers.HashingMemoryFileUploadHandler",
+    "utils.upload_handlers.HashingTemporaryFileUploadHandler",
+]
+# /media/resize/<w>x<h>/<path> 로 만든 크기별 이미지 캐시 (utils/resize.py), 최대 크기를 넘으면 오래 안 쓴 파일부터 삭제
+RESIZE_CACHE_DIR = BASE_DIR / "resize_cache"
+RESIZE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# 업로드 파일이 이 크기(1MB)를 넘으면 메모리 대신 임시 파일로 받음
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+# 업로드/처리할 수 있는 이미지의 최대 화소 수 (utils/images.py)
+IMAGE_MAX_PIXELS = 60 * 1000 * 1000
+
+# 업로드 파일을 앞단 웹서버가 보내도록 위임 (utils/media.py)
+# None : 장고가 직접 보냄, "nginx" : X-Accel-Redirect, "apache" : X-Sendfile
+SENDFILE_BACKEND = None
+# nginx internal location 주소 => 실제 디렉터리
+SENDFILE_NGINX_LOCATIONS = {
+    MEDIA_ROOT: "/_sendfile/media/",
+    RESIZE_CACHE_DIR: "/_sendfile/resize/",
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -157,6 +180,17 @@ MEDIA_ROOT = BASE_DIR / "media"
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# search
+# True : 블로그 검색을 FTS5 색인(blog_fts)으로, False : title/content icontains
+BLOG_FULLTEXT_SEARCH = True
+
+# thumbnail
+# True : 블로그 썸네일을 저장이 커밋된 다음 백그라운드 작업으로 생성 (blog/tasks.py), False : 저장 요청 안에서 바로 생성
+BLOG_THUMBNAIL_ASYNC = True
+
+# 백그라운드 작업 프로세스 풀 크기 (utils/tasks.py), 0 : 커밋된 다음 요청 안에서 바로 실행
+TASKS_WORKERS = 2
+
 # login
 LOGIN_REDIRECT_URL = "/"
 LOGIN_URL = "/login/"
@@ -14,8 +14,6 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.shortcuts import redirect, render
 from django.urls import path, include
@@ -25,6 +23,8 @@ from django.views.generic import TemplateView, RedirectView
 from blog import views
 from blog import cb_views
 from member import views as member_views
+from utils.media import serve_media
+from utils.resize import resize_image
 
 # class AboutView(TemplateView):
 #     template_name = "about.html"
@@ -58,7 +58,9 @@ urlpatterns = [
 
     # summernote
     path("summernote/", include("django_summernote.urls")),
-]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # 크기별 이미지 (아래 media/ 보다 먼저)
+    path("media/resize/<int:width>x<int:height>/<path:path>", resize_image, name="resize_image"),
+    # 업로드 파일 (DEBUG 여부와 상관없이, 운영에서는 SENDFILE_BACKEND 로 웹서버에 위임)
+    path("media/<path:path>", serve_media, name="media"),
+]
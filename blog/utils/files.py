@@ -0,0 +1,20 @@
+import hashlib
+
+from django.db.models.fields.files import FieldFile
+
+
+# 파일 내용의 sha256 (64자 hex)
+# 업로드 파일(UploadedFile), 저장된 파일(FieldFile) 모두 chunk 단위로 읽어서 메모리에 한번에 올리지 않음
+# 업로드 핸들러(utils/upload_handlers.py)가 받는 동안 계산해둔 값(file.sha256)이 있으면 다시 읽지 않음
+def file_sha256(file):
+    if isinstance(file, FieldFile) and not file._committed:
+        file = file.file # 아직 저장 전인 업로드 파일
+
+    if getattr(file, "sha256", None):
+        return file.sha256
+
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0) # 이후에 저장/이미지 열기를 처음부터 할 수 있도록
+    return sha256.hexdigest()
@@ -0,0 +1,52 @@
+import math
+
+from PIL import ExifTags, Image, ImageOps
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+# 메모리를 적게 쓰는 이미지 열기
+#
+# 5000만 화소 사진을 그대로 디코딩하면 RGB 기준 150MB 이상을 한번에 씀
+# - 화소 수 제한 : 헤더만 읽어서(Image.open은 픽셀을 디코딩하지 않음) IMAGE_MAX_PIXELS 를 넘으면 디코딩 전에 거절
+# - JPEG draft 모드 : 필요한 크기(size)가 정해져 있으면 디코더가 1/2, 1/4, 1/8 로 줄이면서 읽음
+#   => 300px 썸네일을 만들 때 원본 크기 전체를 메모리에 올리지 않음 (PNG 등은 그대로 디코딩)
+# - 업로드 파일 자체는 FILE_UPLOAD_MAX_MEMORY_SIZE 를 넘으면 메모리 대신 임시 파일로 받음 (settings.py)
+
+ROTATED_ORIENTATIONS = (5, 6, 7, 8) # EXIF 회전 정보가 90/270도 => 가로/세로가 바뀜
+
+
+# 새로 올린 파일만 검사 : 이미 저장된 파일(FieldFile._committed)은 올릴 때 검사했으므로
+# 관리자 수정 등 full_clean 할 때마다 저장소에서 다시 열지 않음
+def validate_image_pixels(file):
+    if getattr(file, "_committed", False):
+        return
+
+    with Image.open(file) as image:
+        width, height = image.size
+    file.seek(0)
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f"이미지가 너무 큽니다. ({width}x{height}, 최대 {settings.IMAGE_MAX_PIXELS:,}화소)"
+        )
+
+
+# size : 최종적으로 필요한 (너비, 높이), 0 은 비율에 맞춰 계산 => 그보다 작아지지 않는 선에서 줄여서 디코딩
+# 반환하는 이미지는 EXIF 회전까지 반영된 상태
+def open_image(file, size=None):
+    image = Image.open(file)
+    if image.width * image.height > settings.IMAGE_MAX_PIXELS:
+        image.close()
+        raise ValidationError(f"이미지가 너무 큽니다. (최대 {settings.IMAGE_MAX_PIXELS:,}화소)")
+
+    if size:
+        width, height = size
+        if image.getexif().get(ExifTags.Base.Orientation, 1) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        if not width:
+            width = math.ceil(height * image.width / image.height)
+        if not height:
+            height = math.ceil(width * image.height / image.width)
+        image.draft(None, (width, height))
+
+    return ImageOps.exif_transpose(image)
@@ -0,0 +1,171 @@
+import mimetypes
+import os
+import re
+import stat
+from pathlib import Path, PurePosixPath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from utils.storage import REFS_SUFFIX
+
+# 업로드 파일(MEDIA_ROOT) 내려주기 : /media/<path>
+#
+# 예전에는 DEBUG 일 때만 static()으로 내려줬고, 운영에서 내려줄 방법이 없었음
+# 파일 내용은 앞단 웹서버가 보내도록 settings.SENDFILE_BACKEND 로 위임
+# - "nginx"  : X-Accel-Redirect 헤더에 internal location 주소(SENDFILE_NGINX_LOCATIONS)를 담아서 응답
+# - "apache" : X-Sendfile 헤더에 파일 절대 경로를 담아서 응답 (mod_xsendfile)
+# - None     : 장고가 FileResponse로 조금씩(block_size) 읽어서 보냄 => 파일 전체를 메모리에 올리지 않음
+# 장고가 직접 보낼 때도
+# - ETag/Last-Modified => If-None-Match/If-Modified-Since 가 맞으면 304 (본문 없음)
+# - Range => 동영상 탐색, 이어받기에서 요청한 부분만 206 으로 (If-Range가 다르면 전체 200)
+#
+# nginx 설정 예
+# location /_sendfile/media/ { internal; alias /srv/pystagram/media/; }
+# location /_sendfile/resize/ { internal; alias /srv/pystagram/resize_cache/; }
+
+MEDIA_CACHE_CONTROL = "public, max-age=86400"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# 같은 주소에서 열었을 때 스크립트가 실행될 수 있는 형식은 내려받기로만 (업로드한 HTML/SVG로 XSS 방지)
+INLINE_PREFIXES = ("image/", "video/", "audio/")
+ATTACHMENT_TYPES = ("image/svg+xml",)
+
+
+# Range 응답에서 start ~ end 까지만 읽는 파일
+# fileno()가 없으므로 WSGI 서버의 file_wrapper(sendfile)가 파일 끝까지 보내지 않음
+class FileRange:
+    def __init__(self, file, start, end):
+        file.seek(start)
+        self.file = file
+        self.remaining = end - start + 1
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def make_etag(file_stat):
+    return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+# "bytes=0-99", "bytes=100-", "bytes=-100" => (start, end), 없거나 여러 범위면 None (전체 200)
+# 범위가 파일 밖이면 ValueError => 416
+def parse_range(header, size):
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    if not start: # 뒤에서 N바이트
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+# If-Range 가 현재 ETag(또는 Last-Modified)와 같을 때만 Range 요청을 따름
+def if_range_matches(request, etag, file_stat):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(file_stat.st_mtime)
+
+
+def sendfile_url(path):
+    for root, location in settings.SENDFILE_NGINX_LOCATIONS.items():
+        try:
+            relative = Path(path).relative_to(root)
+        except ValueError:
+            continue
+        return location + quote(relative.as_posix())
+    return None
+
+
+# resize_image(utils/resize.py)의 캐시 파일도 같은 방법으로 내려줌
+def send_file(request, path, content_type=None, cache_control=MEDIA_CACHE_CONTROL):
+    try:
+        file_stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404()
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404()
+
+    etag = make_etag(file_stat)
+    response = get_conditional_response(request, etag=etag, last_modified=int(file_stat.st_mtime))
+    if response is None:
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        backend = settings.SENDFILE_BACKEND
+        url = sendfile_url(path) if backend == "nginx" else None
+
+        if url:
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = url
+        elif backend == "apache":
+            response = HttpResponse(content_type=content_type)
+            response["X-Sendfile"] = os.path.abspath(path)
+        else:
+            response = stream_file(request, path, file_stat, etag, content_type)
+
+        if not content_type.startswith(INLINE_PREFIXES) or content_type in ATTACHMENT_TYPES:
+            response["Content-Disposition"] = "attachment"
+
+    # 304 응답에도 검증 헤더와 캐시 정책을 같이 보냄
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(file_stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def stream_file(request, path, file_stat, etag, content_type):
+    size = file_stat.st_size
+    byte_range = None
+    if "Range" in request.headers and if_range_matches(request, etag, file_stat):
+        try:
+            byte_range = parse_range(request.headers["Range"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end), content_type=content_type, status=206)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    # 점으로 시작하는 파일(락 등)과 참조 수 파일(.refs)은 내려주지 않음
+    parts = PurePosixPath(path).parts
+    if any(part.startswith(".") for part in parts) or path.endswith(REFS_SUFFIX):
+        raise Http404()
+
+    try:
+        file_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404()
+    return send_file(request, file_path)
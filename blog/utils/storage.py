@@ -0,0 +1,113 @@
+import fcntl
+import os
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.utils import validate_file_name
+
+from utils.files import file_sha256
+
+# 내용 기반(content-addressed) 미디어 저장소
+#
+# 파일 이름 대신 파일 내용의 sha256으로 저장 위치를 정함
+# post/2025/10/01/사진.jpg => post/3f/a2/3fa2...c9.jpg
+# - 같은 사진을 여러번 올려도 파일은 하나 (두번째부터는 쓰기 없이 참조 수만 +1)
+# - 앞 2글자/다음 2글자로 디렉터리를 나눠서(256 x 256) 하루치 업로드가 한 디렉터리에 몰리지 않음
+#
+# 참조 수는 파일 옆의 .refs 파일에 숫자로 저장, 여러 프로세스가 동시에 올리거나 지워도 되도록 fcntl 락을 걸고 읽고 씀
+# delete()는 참조 수를 -1 하고 0이 될 때만 실제 파일을 지움
+# 해시는 업로드를 받는 동안 계산해둔 값(utils/upload_handlers.py => content.sha256)을 쓰고, 없을 때만 파일을 한번 읽어서 계산
+# 이 저장소 이전에 저장된 파일(날짜 경로, .refs 없음)은 예전처럼 delete()에서 바로 지움
+
+REFS_SUFFIX = ".refs"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    # upload_to의 첫 디렉터리(post, blog ...)는 유지
+    def hashed_name(self, name, sha256):
+        path = PurePosixPath(name)
+        prefix = path.parts[0] if len(path.parts) > 1 else ""
+        return str(PurePosixPath(prefix, sha256[:2], sha256[2:4], f"{sha256}{path.suffix.lower()}"))
+
+    # 같은 .refs 파일에 락을 건 상태로 실행
+    # 락을 기다리는 동안 다른 프로세스가 .refs를 지웠으면(참조 수 0) 새로 만든 .refs로 다시 시도
+    @contextmanager
+    def locked_refs(self, name):
+        refs_path = self.path(name) + REFS_SUFFIX
+        while True:
+            refs = open(refs_path, "a+")
+            fcntl.flock(refs, fcntl.LOCK_EX)
+            try:
+                if os.path.samestat(os.fstat(refs.fileno()), os.stat(refs_path)):
+                    break
+            except FileNotFoundError:
+                pass
+            refs.close()
+
+        try:
+            yield refs
+        finally:
+            refs.close() # 닫으면 락도 풀림
+
+    def read_refs(self, refs, name):
+        refs.seek(0)
+        value = refs.read().strip()
+        if value:
+            return int(value)
+        return 1 if super().exists(name) else 0
+
+    def write_refs(self, refs, count):
+        refs.seek(0)
+        refs.truncate()
+        refs.write(str(count))
+        refs.flush()
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        sha256 = getattr(content, "sha256", None) or file_sha256(content)
+        name = self.hashed_name(name, sha256)
+        validate_file_name(name, allow_relative_path=True)
+
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        with self.locked_refs(name) as refs:
+            count = self.read_refs(refs, name)
+            if not count:
+                self._save(name, content)
+            self.write_refs(refs, count + 1)
+
+        return name
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("The name must be given to delete().")
+
+        if not os.path.exists(self.path(name) + REFS_SUFFIX):
+            return super().delete(name)
+
+        with self.locked_refs(name) as refs:
+            count = self.read_refs(refs, name) - 1
+            if count > 0:
+                self.write_refs(refs, count)
+                return
+
+            super().delete(name)
+            os.remove(self.path(name) + REFS_SUFFIX)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+# 모델 필드의 storage=media_storage (호출 가능한 storage => 설정에 따라 저장소 선택, 마이그레이션에는 함수 경로만 기록)
+# settings.MEDIA_CONTENT_ADDRESSED = False 면 예전처럼 기본 저장소(날짜 경로)
+def media_storage():
+    if settings.MEDIA_CONTENT_ADDRESSED:
+        return content_addressed_storage
+    return default_storage
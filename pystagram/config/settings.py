@@ -140,6 +140,36 @@ STATIC_ROOT = BASE_DIR / ".static_root"
 # Media
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# True : 업로드 이미지를 내용(sha256) 기준 경로에 저장하고 같은 파일은 공유 (utils/storage.py)
+MEDIA_CONTENT_ADDRESSED = True
+# 업로드를 받는 동안 sha256을 계산하는 핸들러 (기본 핸들러와 같은 순서 : 메모리 => 임시 파일)
+FILE_UPLOAD_HANDLERS = [
+    "utils.upload_handlers.HashingMemoryFileUploadHandler",
+    "utils.upload_handlers.HashingTemporaryFileUploadHandler",
+]
+# /media/resize/<w>x<h>/<path> 로 만든 크기별 이미지 캐시 (utils/resize.py), 최대 크기를 넘으면 오래 안 쓴 파일부터 삭제
+RESIZE_CACHE_DIR = BASE_DIR / "resize_cache"
+RESIZE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# 업로드 파일이 이 크기(1MB)를 넘으면 메모리 대신 임시 파일로 받음
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+# 업로드/처리할 수 있는 이미지의 최대 화소 수 (utils/images.py)
+IMAGE_MAX_PIXELS = 60 * 1000 * 1000
+
+# 업로드 파일을 앞단 웹서버가 보내도록 위임 (utils/media.py)
+# None : 장고가 직접 보냄, "nginx" : X-Accel-Redirect, "apache" : X-Sendfile
+SENDFILE_BACKEND = None
+# nginx internal location 주소 => 실제 디렉터리
+SENDFILE_NGINX_LOCATIONS = {
+    MEDIA_ROOT: "/_sendfile/media/",
+    RESIZE_CACHE_DIR: "/_sendfile/resize/",
+}
+
+# 나눠서 올리는 이미지 (post/upload_views.py)
+CHUNKED_UPLOAD_DIR = BASE_DIR / "chunked_uploads"
+CHUNKED_UPLOAD_MAX_SIZE = 50 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_FILES = 10 # 포스트 하나에 한번에 붙일 수 있는 이미지 수
+CHUNKED_UPLOAD_MAX_OPEN = 20 # 유저 한명이 동시에 열어둘 수 있는 업로드 수 (임시 파일로 디스크를 채우지 못하도록)
+CHUNKED_UPLOAD_EXPIRE_HOURS = 24 # 이 시간 동안 끝나지 않은 업로드는 clean_chunked_uploads 로 삭제
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -159,6 +189,14 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = SECRET["email"]["user"]
 EMAIL_HOST_PASSWORD = SECRET["email"]["password"]
 
+# Timeline
+# 팔로워가 이 수보다 많은 계정의 포스트는 팔로워 타임라인에 미리 넣지 않고(fan-out X) 읽을 때 가져옴
+TIMELINE_FANOUT_LIMIT = 10000
+
+# 백그라운드 작업 프로세스 풀 크기 (utils/tasks.py, post/tasks.py)
+# 0 : 커밋된 다음 요청 안에서 바로 실행 (프로세스 풀은 웹 서버 프로세스마다 따로 뜨고 재시작되면 쌓인 작업이 사라짐)
+TASKS_WORKERS = 0
+
 LOGIN_URL = "/login/"
 LOGOUT_REDIRECT_URL = "/"
 
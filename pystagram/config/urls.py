@@ -14,8 +14,6 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.views import LogoutView
 from django.urls import path, include
@@ -23,6 +21,8 @@ from django.views.generic import TemplateView
 
 from member import views as member_views
 from post import views as post_views
+from utils.media import serve_media
+from utils.resize import resize_image
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -43,14 +43,19 @@ urlpatterns = [
 
     # search
     path("search/", post_views.search, name="search"),
+    path("search/trending/", post_views.trending_tags, name="trending_tags"),
+    path("search/tags/", post_views.tag_autocomplete, name="tag_autocomplete"),
 
     # include
     path("comment/", include("post.comment_urls")),
+    path("upload/", include("post.upload_urls")),
     path("profile/", include("member.urls")),
     path("oauth/", include("member.oauth_urls")),
 
+    # 크기별 이미지 (아래 media/ 보다 먼저)
+    path("media/resize/<int:width>x<int:height>/<path:path>", resize_image, name="resize_image"),
+    # 업로드 파일 (DEBUG 여부와 상관없이, 운영에서는 SENDFILE_BACKEND 로 웹서버에 위임)
+    path("media/<path:path>", serve_media, name="media"),
+
     # path("signup/done/", TemplateView.as_view(template_name="auth/signup_done.html"), name="signup_done"),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
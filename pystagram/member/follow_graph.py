@@ -0,0 +1,69 @@
+import bisect
+import time
+from array import array
+
+from django.core.cache import cache
+
+from member.models import UserFollowing
+
+# 팔로우 그래프 캐시
+#
+# 유저마다 "내가 팔로우 하는 유저 id"를 정렬된 array("q")로 캐시에 저장 (숫자만 촘촘하게 => 팔로잉 1만명도 80KB)
+# "이 N명 중에 내가 팔로우 하는 사람은?" => 캐시 한번 읽고 bisect로 확인 => 유저마다 UserFollowing 쿼리 X
+# 팔로우/언팔로우 하면(UserFollowingView) 그 유저의 버전을 올려서 이전 캐시 키를 버림
+# 버전 키가 캐시에서 밀려나도 예전 버전 번호를 다시 쓰지 않도록 처음 버전은 현재 시각(ns)으로 시작
+#
+# 주의 : CACHES 설정이 없으면 프로세스(워커)마다 따로인 LocMemCache
+# => 버전을 올린 프로세스만 바로 반영되고, 다른 프로세스는 FOLLOW_GRAPH_CACHE_TIMEOUT 이 지나야 반영됨
+#    (Redis/Memcached 같은 공유 캐시를 설정하면 모든 프로세스에 바로 반영)
+# 그래서 검색 결과 배지, 추천 목록처럼 잠깐 틀려도 되는 곳에만 사용하고
+# 팔로우 버튼(is_following)처럼 누르면 상태가 바뀌는 곳은 DB에서 확인
+
+FOLLOW_GRAPH_CACHE_TIMEOUT = 60
+
+
+def version_key(user_id):
+    return f"follow_graph_version:{user_id}"
+
+
+def get_version(user_id):
+    return cache.get_or_set(version_key(user_id), time.time_ns, None)
+
+
+def bump_version(user_id):
+    try:
+        cache.incr(version_key(user_id))
+    except ValueError: # 버전 키가 없는 경우
+        cache.set(version_key(user_id), time.time_ns(), None)
+
+
+def get_following_ids(user_id):
+    key = f"follow_graph:{user_id}:{get_version(user_id)}"
+    following_ids = cache.get(key)
+    if following_ids is None:
+        following_ids = array("q", sorted(
+            UserFollowing.objects.filter(from_user_id=user_id).values_list("to_user_id", flat=True)
+        ))
+        cache.set(key, following_ids, FOLLOW_GRAPH_CACHE_TIMEOUT)
+    return following_ids
+
+
+def contains(following_ids, user_id):
+    index = bisect.bisect_left(following_ids, user_id)
+    return index < len(following_ids) and following_ids[index] == user_id
+
+
+# user가 ids 중에서 팔로우 하는 유저 id set (비로그인 유저는 빈 set)
+def following_among(user, ids):
+    if not user.is_authenticated:
+        return set()
+
+    following_ids = get_following_ids(user.pk)
+    return {user_id for user_id in ids if contains(following_ids, user_id)}
+
+
+# 팔로우 버튼 상태 : 캐시가 아니라 DB에서 확인 (다른 프로세스에서 바뀐 팔로우도 바로 보이도록)
+def is_following(user, to_user_id):
+    if not user.is_authenticated:
+        return False
+    return UserFollowing.objects.filter(from_user_id=user.pk, to_user_id=to_user_id).exists()
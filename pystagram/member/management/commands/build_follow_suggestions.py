@@ -0,0 +1,71 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from member.models import FollowSuggestion, UserFollowing
+
+User = get_user_model()
+
+
+# python manage.py build_follow_suggestions
+# 1. UserFollowing 전체를 한번 읽어서 메모리에 인접 리스트(유저 id => 팔로잉 id 리스트)로 만듦
+# 2. 유저마다 팔로잉의 팔로잉(친구의 친구)을 세고, 이미 팔로우 한 사람/본인을 빼고 상위 --top-k명
+# 3. --chunk-size명씩 모아서 기존 추천을 지우고 bulk_create (유저마다 쿼리 X)
+# => 요청마다 UserFollowing을 2번 JOIN 하는 대신 주기적으로(cron 등) 실행
+def load_following():
+    following = defaultdict(list)
+    rows = UserFollowing.objects.order_by().values_list("from_user_id", "to_user_id")
+    for from_user_id, to_user_id in rows.iterator(chunk_size=10000):
+        following[from_user_id].append(to_user_id)
+    return following
+
+
+def suggest(user_id, following, top_k):
+    my_following = following.get(user_id, [])
+    excluded = set(my_following)
+    excluded.add(user_id)
+
+    counter = Counter()
+    for friend_id in my_following:
+        for candidate_id in following.get(friend_id, []):
+            if candidate_id not in excluded:
+                counter[candidate_id] += 1
+
+    # 같은 수면 id가 작은(먼저 가입한) 유저 먼저
+    return heapq.nsmallest(top_k, counter.items(), key=lambda item: (-item[1], item[0]))
+
+
+class Command(BaseCommand):
+    help = "친구의 친구로 팔로우 추천을 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=20)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        top_k = options["top_k"]
+        chunk_size = options["chunk_size"]
+        following = load_following()
+
+        user_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+        created = 0
+
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            suggestions = [
+                FollowSuggestion(user_id=user_id, suggested_id=suggested_id, mutual_count=mutual_count)
+                for user_id in chunk
+                for suggested_id, mutual_count in suggest(user_id, following, top_k)
+            ]
+
+            with transaction.atomic():
+                FollowSuggestion.objects.filter(user_id__in=chunk).delete()
+                FollowSuggestion.objects.bulk_create(suggestions)
+
+            created += len(suggestions)
+            self.stdout.write(f"~ user {chunk[-1]}")
+
+        self.stdout.write(self.style.SUCCESS(f"{created}개의 팔로우 추천을 만들었습니다."))
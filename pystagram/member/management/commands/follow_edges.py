@@ -0,0 +1,159 @@
+import csv
+import json
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from member.follow_graph import bump_version
+from member.models import UserFollowing
+
+User = get_user_model()
+
+# 팔로우 관계(from_user => to_user) 대량 가져오기/내보내기
+#
+# python manage.py follow_edges import edges.csv [--key nickname]
+# python manage.py follow_edges export edges.jsonl
+#
+# 파일 형식 : 확장자로 구분 (.csv => from_user,to_user 헤더가 있는 CSV, .jsonl => 한 줄에 {"from_user": .., "to_user": ..})
+# 파일 이름을 - 로 주면 표준 입력/출력 사용
+# --key : 파일에 적힌 유저 값이 id, email, nickname 중 무엇인지
+#
+# 가져오기 : 파일을 한 줄씩 읽어서 --batch-size개씩 bulk_create(ignore_conflicts=True)
+# => 이미 있는 관계는 건너뜀, 메모리에는 한 배치만 올라감, 배치마다 하나의 트랜잭션
+# UserFollowingView처럼 관계마다 get_or_create + 카운터 UPDATE 를 하지 않고
+# 다 넣은 뒤에 recount_user_counters 로 카운터를 한번만 다시 계산
+# 피드(Timeline)는 필요하면 python manage.py rebuild_timeline 으로 채움
+
+KEY_FIELDS = ("id", "email", "nickname")
+FORMATS = ("csv", "jsonl")
+
+
+class Command(BaseCommand):
+    help = "팔로우 관계를 CSV/JSONL 파일로 가져오거나 내보냅니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=("import", "export"))
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--key", choices=KEY_FIELDS, default="id")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or self.guess_format(options["path"])
+
+        if options["action"] == "import":
+            self.import_edges(options["path"], file_format, options["key"], options["batch_size"])
+        else:
+            self.export_edges(options["path"], file_format, options["key"], options["batch_size"])
+
+    def guess_format(self, path):
+        for file_format in FORMATS:
+            if path.endswith(f".{file_format}"):
+                return file_format
+        raise CommandError("--format 을 지정해주세요. (csv, jsonl)")
+
+    def open(self, path, mode):
+        if path == "-":
+            return nullcontext(sys.stdin if mode == "r" else self.stdout)
+        return open(path, mode, encoding="utf-8", newline="")
+
+    # (줄 번호, from_user, to_user) : 값이 없거나 JSON이 아닌 줄은 None => clean_value 에서 걸러짐
+    def read_edges(self, file, file_format):
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row.get("from_user"), row.get("to_user")
+        else:
+            for line_num, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        row = None
+                    if not isinstance(row, dict):
+                        row = {}
+                    yield line_num, row.get("from_user"), row.get("to_user")
+
+    # 파일의 유저 값 검사 : --key id 이면 숫자만, 잘못된 값이면 None
+    def clean_value(self, key, value):
+        if key == "id":
+            value = str(value).strip()
+            return int(value) if value.isascii() and value.isdigit() else None
+        return value if isinstance(value, str) and value else None
+
+    # 배치에 나온 유저 값들을 pk로 한번에 바꿈 (없는 유저는 빠짐)
+    def resolve(self, key, values):
+        return dict(User.objects.filter(**{f"{key}__in": values}).values_list(key, "pk"))
+
+    def import_edges(self, path, file_format, key, batch_size):
+        created = skipped = invalid = 0
+        from_user_ids = set()
+
+        with self.open(path, "r") as file:
+            edges = self.read_edges(file, file_format)
+            while True:
+                batch = list(islice(edges, batch_size))
+                if not batch:
+                    break
+
+                # 값이 잘못된 줄은 알려주고 건너뜀 (전체 가져오기를 멈추지 않음)
+                edges_batch = []
+                for line_num, from_user, to_user in batch:
+                    from_user, to_user = self.clean_value(key, from_user), self.clean_value(key, to_user)
+                    if from_user is None or to_user is None:
+                        self.stderr.write(f"{line_num}번째 줄 : 유저 값이 잘못되어 건너뜁니다.")
+                        invalid += 1
+                    else:
+                        edges_batch.append((from_user, to_user))
+                batch = edges_batch
+
+                pks = self.resolve(key, {value for edge in batch for value in edge})
+
+                followings = [
+                    UserFollowing(from_user_id=pks[from_user], to_user_id=pks[to_user])
+                    for from_user, to_user in batch
+                    if from_user in pks and to_user in pks and pks[from_user] != pks[to_user]
+                ]
+
+                with transaction.atomic():
+                    UserFollowing.objects.bulk_create(followings, ignore_conflicts=True)
+
+                created += len(followings)
+                skipped += len(batch) - len(followings)
+                from_user_ids.update(following.from_user_id for following in followings)
+                self.stderr.write(f"~ {created + skipped + invalid} edges")
+
+        call_command("recount_user_counters", stdout=self.stderr)
+        # 이 커맨드 프로세스의 캐시만 무효화됨 (CACHES 설정이 없으면 프로세스마다 따로인 LocMemCache)
+        # 웹 서버 워커들은 FOLLOW_GRAPH_CACHE_TIMEOUT 이 지나면 새 관계를 읽음 (Redis 등 공유 캐시면 바로)
+        for user_id in from_user_ids:
+            bump_version(user_id)
+
+        self.stderr.write(self.style.SUCCESS(
+            f"{created}개의 팔로우 관계를 가져왔습니다. (이미 있던 관계 포함, 건너뜀 {skipped}개, 잘못된 줄 {invalid}개)"
+        ))
+
+    def export_edges(self, path, file_format, key, batch_size):
+        edges = (UserFollowing.objects.order_by("pk")
+                 .values_list(f"from_user__{key}", f"to_user__{key}")
+                 .iterator(chunk_size=batch_size))
+        exported = 0
+
+        with self.open(path, "w") as file:
+            if file_format == "csv":
+                writer = csv.writer(file)
+                writer.writerow(("from_user", "to_user"))
+                for edge in edges:
+                    writer.writerow(edge)
+                    exported += 1
+            else:
+                for from_user, to_user in edges:
+                    file.write(json.dumps({"from_user": from_user, "to_user": to_user}, ensure_ascii=False) + "\n")
+                    exported += 1
+
+        self.stderr.write(self.style.SUCCESS(f"{exported}개의 팔로우 관계를 내보냈습니다."))
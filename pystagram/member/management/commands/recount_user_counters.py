@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
+
+from member.models import UserFollowing
+from post.models import Post
+
+User = get_user_model()
+
+
+# python manage.py recount_user_counters
+# User.post_count, follower_count, following_count를 실제 row 수로 다시 계산
+# recount_post_counters와 같이 id 순서로 chunk_size명씩 나눠서 처리
+def count_subquery(queryset, field):
+    counts = (queryset.filter(**{field: OuterRef("pk")})
+              .order_by()
+              .values(field)
+              .annotate(count=Count("pk"))
+              .values("count"))
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "유저의 포스트/팔로워/팔로잉 카운터를 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_pk = 0
+        updated = 0
+
+        while True:
+            pks = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+
+            with transaction.atomic():
+                updated += User.objects.filter(pk__in=pks).update(
+                    post_count=count_subquery(Post.objects.all(), "user"),
+                    follower_count=count_subquery(UserFollowing.objects.all(), "to_user"),
+                    following_count=count_subquery(UserFollowing.objects.all(), "from_user"),
+                )
+
+            last_pk = pks[-1]
+            self.stdout.write(f"~ user {last_pk}")
+
+        self.stdout.write(self.style.SUCCESS(f"{updated}명의 유저 카운터를 다시 계산했습니다."))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_nicknames(apps, schema_editor):
+    User = apps.get_model("member", "User")
+    NicknameGram = apps.get_model("member", "NicknameGram")
+
+    for user in User.objects.iterator():
+        nickname = (user.nickname or "").lower()
+        grams = set(nickname) | {nickname[i:i + 2] for i in range(len(nickname) - 1)}
+        NicknameGram.objects.bulk_create(
+            [NicknameGram(user=user, gram=gram) for gram in grams],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0003_alter_userfollowing_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NicknameGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=2, verbose_name='gram')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nickname_grams', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('gram', 'user')},
+            },
+        ),
+        migrations.RunPython(index_nicknames, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:56
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model("member", "User")
+    UserFollowing = apps.get_model("member", "UserFollowing")
+    Post = apps.get_model("post", "Post")
+
+    def count_subquery(model, field):
+        counts = (model.objects.filter(**{field: OuterRef("pk")}).order_by()
+                  .values(field).annotate(count=Count("pk")).values("count"))
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    User.objects.update(
+        post_count=count_subquery(Post, "user"),
+        follower_count=count_subquery(UserFollowing, "to_user"),
+        following_count=count_subquery(UserFollowing, "from_user"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0004_nicknamegram'),
+        ('post', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='팔로워 수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='팔로잉 수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='포스트 수'),
+        ),
+        migrations.AddIndex(
+            model_name='userfollowing',
+            index=models.Index(fields=['to_user', '-created_at', '-id'], name='follow_to_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userfollowing',
+            index=models.Index(fields=['from_user', '-created_at', '-id'], name='follow_from_user_created_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 
 from utils.models import TimeStampModel
 
@@ -60,6 +62,12 @@ class User(AbstractBaseUser):
         "self", symmetrical=False, related_name="followers",
         through="UserFollowing", through_fields=("from_user", "to_user")
     )
+    # 프로필에 보여줄 숫자를 매번 COUNT 하지 않도록 저장해두는 카운터
+    # 팔로우/언팔로우(UserFollowingView), 포스트 작성/삭제(post/models.py 시그널)에서 F()로 +1/-1
+    # 어긋났을 때는 python manage.py recount_user_counters
+    post_count = models.PositiveIntegerField("포스트 수", default=0)
+    follower_count = models.PositiveIntegerField("팔로워 수", default=0)
+    following_count = models.PositiveIntegerField("팔로잉 수", default=0)
 
     objects = UserManager()
     # Django 기본 User의 로그인 ID는 username 필드인데, 이걸 email 필드로 바꾸겠다는 뜻
@@ -115,8 +123,52 @@ class UserFollowing(TimeStampModel):
 
     class Meta:
         unique_together = ("to_user", "from_user")
+        # 팔로워/팔로잉 목록 커서 페이지네이션((created_at, id) 최신순)용 인덱스
+        indexes = [
+            models.Index(fields=["to_user", "-created_at", "-id"], name="follow_to_user_created_idx"),
+            models.Index(fields=["from_user", "-created_at", "-id"], name="follow_from_user_created_idx"),
+        ]
     # to_user 1, from_user 2 O
     # to_user 1, from_user 3 O
     # to_user 1, from_user 4 O
 
     # to_user 1, from_user 2 X => 기존에 있던걸 다시 만들려고 시도하면 오류
+
+
+# 닉네임 부분 검색용 n-gram 인덱스
+# 닉네임을 소문자로 바꿔서 글자 하나(unigram), 연속된 두 글자(bigram)를 row로 저장
+# 예) "파이썬" => 파, 이, 썬, 파이, 이썬
+# 한글은 두 글자 단어가 많아서 trigram보다 bigram이 잘 맞음
+# "이썬" 검색 => gram이 "이썬"인 유저 목록(posting list)에서 바로 찾음 => member_user 전체 스캔(icontains) X
+class NicknameGram(models.Model):
+    gram = models.CharField("gram", max_length=2)
+    user = models.ForeignKey(User, related_name="nickname_grams", on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ("gram", "user") # (gram, user) 인덱스로 gram 검색
+
+
+# 알 수도 있는 사람 (팔로우 추천)
+# 내가 팔로우 하는 사람들이 팔로우 하는 사람(친구의 친구)을 겹치는 수(mutual_count)가 많은 순으로
+# 요청마다 계산하지 않고 python manage.py build_follow_suggestions 로 미리 계산해서 저장
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(User, related_name="follow_suggestions", on_delete=models.CASCADE)
+    suggested = models.ForeignKey(User, related_name="+", on_delete=models.CASCADE)
+    mutual_count = models.PositiveIntegerField("함께 아는 친구 수")
+
+    class Meta:
+        unique_together = ("user", "suggested")
+        # 위젯에서 (user = ?) ORDER BY mutual_count DESC 를 인덱스만으로 읽음
+        indexes = [
+            models.Index(fields=["user", "-mutual_count"], name="suggestion_user_mutual_idx"),
+        ]
+
+
+# 닉네임이 바뀔 때만 n-gram 다시 계산 (로그인 시 last_login만 저장하는 경우 등은 건너뜀)
+@receiver(post_save, sender=User)
+def user_post_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and "nickname" not in update_fields:
+        return
+
+    from member.search import index_nickname
+    index_nickname(instance)
\ No newline at end of file
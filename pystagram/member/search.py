@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+
+from member.models import NicknameGram
+
+User = get_user_model()
+
+# 닉네임 n-gram 검색
+# 검색어의 gram들이 "모두" 들어있는 유저 = 각 gram의 posting list 교집합
+# 교집합은 bigram 순서까지는 보장하지 않으므로("ab", "bc" => "abxbc"도 포함) 마지막에 icontains로 후보만 한번 더 확인
+
+
+def nickname_grams(nickname):
+    nickname = nickname.lower()
+    return set(nickname) | {nickname[i:i + 2] for i in range(len(nickname) - 1)}
+
+
+# 태그와 같은 방식 : 지금 저장된 gram과 비교해서 바뀐 부분만 추가/삭제
+def index_nickname(user):
+    grams = nickname_grams(user.nickname or "")
+
+    with transaction.atomic():
+        indexed = set(NicknameGram.objects.filter(user=user).values_list("gram", flat=True))
+
+        removed = indexed - grams
+        if removed:
+            NicknameGram.objects.filter(user=user, gram__in=removed).delete()
+
+        added = grams - indexed
+        if added:
+            NicknameGram.objects.bulk_create(
+                [NicknameGram(user=user, gram=gram) for gram in added],
+                ignore_conflicts=True,
+            )
+
+
+def search_users(q):
+    q = q.lower()
+    # 검색어가 한 글자면 unigram, 그 이상이면 bigram만 사용
+    grams = set(q) if len(q) == 1 else nickname_grams(q) - set(q)
+
+    candidates = (NicknameGram.objects.filter(gram__in=grams)
+                  .values("user")
+                  .annotate(matched=Count("gram"))
+                  .filter(matched=len(grams))
+                  .values("user"))
+
+    return User.objects.filter(pk__in=candidates, nickname__icontains=q)
@@ -0,0 +1,22 @@
+from member.follow_graph import following_among
+from member.models import FollowSuggestion
+
+FOLLOW_SUGGESTIONS_SIZE = 5
+
+
+# 미리 계산된 추천을 (user, -mutual_count) 인덱스로 한번에 읽음
+# 계산 이후에 팔로우 한 유저는 팔로우 그래프 캐시로 걸러냄 (그만큼 여유있게 더 읽어둠)
+def get_follow_suggestions(user, size=FOLLOW_SUGGESTIONS_SIZE):
+    if not user.is_authenticated:
+        return []
+
+    suggestions = list(
+        FollowSuggestion.objects.filter(user=user)
+        .select_related("suggested")
+        .order_by("-mutual_count")[:size * 2]
+    )
+    following_ids = following_among(user, [suggestion.suggested_id for suggestion in suggestions])
+    return [
+        suggestion for suggestion in suggestions
+        if suggestion.suggested_id not in following_ids
+    ][:size]
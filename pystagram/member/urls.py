@@ -6,4 +6,6 @@ app_name = "profile"
 urlpatterns = [
     path('<str:slug>/', views.UserProfileView.as_view(), name="detail"),
     path("<int:pk>/follow/", views.UserFollowingView.as_view(), name="follow"),
+    path("<int:pk>/followers/", views.followers, name="followers"),
+    path("<int:pk>/following/", views.following, name="following"),
 ]
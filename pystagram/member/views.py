@@ -3,18 +3,29 @@ from django.contrib.auth import get_user_model, login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core import signing
 from django.core.signing import TimestampSigner, SignatureExpired
-from django.http import HttpResponseRedirect, Http404
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponseRedirect, Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy, reverse
 from django.views import View
 from django.views.generic import FormView, DetailView
 
+from member.follow_graph import bump_version, is_following
 from member.forms import SignupForm, LoginForm
 from member.models import UserFollowing
+from member.suggestions import get_follow_suggestions
+from post.models import Post
+from post.timeline import backfill_following, remove_following
 from utils.email import send_email
+from utils.pagination import CursorPaginator
 
 User = get_user_model()
 
+PROFILE_POSTS_PAGE_SIZE = 12
+FOLLOW_LIST_PAGE_SIZE = 20
+
 class SignupView(FormView):
     template_name = "auth/signup.html"
     form_class = SignupForm
@@ -118,37 +129,84 @@ class UserProfileView(DetailView):
     template_name = "profile/detail.html"
     slug_field = "nickname"
     slug_url_kwarg = "slug"
-    queryset = (User.objects.all()
-                .prefetch_related("post_set", "post_set__images", "following", "followers"))
+    # 포스트/팔로워/팔로잉 수는 User에 저장된 카운터를 사용하고
+    # 포스트 그리드는 커서로 PROFILE_POSTS_PAGE_SIZE개씩, 팔로워/팔로잉 목록은 모달을 열 때 따로 가져옴
+    # => 팔로워가 많은 계정도 프로필 한번에 전부 prefetch 하지 않음
 
     def get_context_data(self, **kwargs):
         data = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            data["is_follow"] = UserFollowing.objects.filter(
-                to_user=self.object,
-                from_user=self.request.user,
-            )
+        paginator = CursorPaginator(
+            Post.objects.filter(user=self.object).prefetch_related("images"),
+            PROFILE_POSTS_PAGE_SIZE,
+        )
+        data["page_obj"] = paginator.get_page(self.request.GET.get("cursor"))
+
+        data["is_follow"] = is_following(self.request.user, self.object.pk)
+        if self.object == self.request.user and not self.request.GET.get("cursor"):
+            data["follow_suggestions"] = get_follow_suggestions(self.request.user)
 
         return data
 
 
+# 팔로워/팔로잉 목록 (프로필 모달에서 열 때, 스크롤 할 때 FOLLOW_LIST_PAGE_SIZE개씩)
+# html : 유저 목록 조각(include/user_list.html), next_cursor : 더 가져올 유저가 없으면 None
+def follow_list(request, queryset, user_field):
+    paginator = CursorPaginator(queryset.select_related(user_field), FOLLOW_LIST_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get("cursor"))
+
+    users = [getattr(following, user_field) for following in page.object_list]
+    html = render_to_string("include/user_list.html", {"users": users}, request)
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
+
+
+def followers(request, pk):
+    return follow_list(request, UserFollowing.objects.filter(to_user_id=pk), "from_user")
+
+
+def following(request, pk):
+    return follow_list(request, UserFollowing.objects.filter(from_user_id=pk), "to_user")
+
+
 class UserFollowingView(LoginRequiredMixin, View):
     def post(self, *args, **kwargs):
         pk = kwargs.get("pk", 0)
         to_user = get_object_or_404(User, pk=pk)
+        from_user = self.request.user
 
-        if to_user == self.request.user:
+        if to_user == from_user:
             raise Http404
 
-        # 만약 이미 팔로우가 되어 있으면 팔로우 취소 => UserFollowing row 삭제
-        # 안 되어 있으면 팔로우 시작 => UserFollowing row 생성
-        following, created = UserFollowing.objects.get_or_create(
-            to_user=to_user,
-            from_user=self.request.user,
-        )
-
-        if not created:
-            following.delete()
+        # action : 화면에 보이던 버튼(Follow/Unfollow)대로 팔로우 시작/취소
+        # => 다른 탭/기기에서 이미 상태가 바뀌었어도 버튼과 반대로 동작하지 않음 (이미 그 상태면 아무것도 안 함)
+        # action 이 없으면 예전처럼 토글 : 이미 팔로우가 되어 있으면 취소, 안 되어 있으면 시작
+        # row 생성/삭제와 follower_count, following_count 증감을 하나의 트랜잭션으로
+        action = self.request.POST.get("action")
+        changed = False
+        with transaction.atomic():
+            following = UserFollowing.objects.filter(to_user=to_user, from_user=from_user).first()
+            follow = action == "follow" if action in ("follow", "unfollow") else following is None
+
+            if follow and following is None:
+                _, changed = UserFollowing.objects.get_or_create(to_user=to_user, from_user=from_user)
+                if changed:
+                    User.objects.filter(pk=to_user.pk).update(follower_count=F("follower_count") + 1)
+                    User.objects.filter(pk=from_user.pk).update(following_count=F("following_count") + 1)
+            elif not follow and following is not None:
+                changed = UserFollowing.objects.filter(pk=following.pk).delete()[0] > 0
+                if changed:
+                    User.objects.filter(pk=to_user.pk, follower_count__gt=0).update(
+                        follower_count=F("follower_count") - 1
+                    )
+                    User.objects.filter(pk=from_user.pk, following_count__gt=0).update(
+                        following_count=F("following_count") - 1
+                    )
+
+        if changed:
+            bump_version(from_user.pk)
+            if follow:
+                backfill_following(from_user, to_user)
+            else:
+                remove_following(from_user, to_user)
 
         return HttpResponseRedirect(
             reverse("profile:detail", kwargs={"slug": to_user.nickname})
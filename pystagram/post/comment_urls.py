@@ -6,4 +6,5 @@ app_name = "comment"
 
 urlpatterns = [
     path('create/<int:post_pk>/', views.CommentCreateView.as_view(), name="create"),
+    path('<int:post_pk>/', views.comment_list, name="list"),
 ]
\ No newline at end of file
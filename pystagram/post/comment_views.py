@@ -1,10 +1,24 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponseRedirect
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponseRedirect, JsonResponse
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views.generic import CreateView
 
 from post.forms import CommentForm
 from post.models import Comment, Post
+from utils.pagination import CursorPaginator
+
+COMMENTS_PAGE_SIZE = 20
+
+
+def comment_paginator(post_pk):
+    return CursorPaginator(
+        Comment.objects.filter(post_id=post_pk).select_related("user"),
+        COMMENTS_PAGE_SIZE,
+        Comment.ORDERING,
+    )
 
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
@@ -17,6 +31,19 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
 
         post = Post.objects.get(pk=self.kwargs.get("post_pk"))
         self.object.post = post
-        self.object.save()
+
+        # 댓글 저장과 comment_count 증가를 하나의 트랜잭션으로
+        with transaction.atomic():
+            self.object.save()
+            Post.objects.filter(pk=post.pk).update(comment_count=F("comment_count") + 1)
 
         return HttpResponseRedirect(reverse("main"))
+
+
+# "댓글 더보기" : 피드에 보이는 최신 댓글 다음부터 커서로 COMMENTS_PAGE_SIZE개씩 가져옴
+# html : 댓글 목록 조각(include/comment.html), next_cursor : 더 가져올 댓글이 없으면 None
+def comment_list(request, post_pk):
+    page = comment_paginator(post_pk).get_page(request.GET.get("cursor"))
+
+    html = render_to_string("include/comment_list.html", {"comments": page.object_list}, request)
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
@@ -0,0 +1,105 @@
+import base64
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from PIL import Image
+
+from django.core.files.base import ContentFile
+
+from utils.images import open_image
+
+# 업로드 이미지의 크기별 파생 이미지(variants)
+#
+# 피드/프로필/태그 검색의 작은 칸(col-4 등)에도 원본(수 MB)을 그대로 내려보내지 않도록
+# 업로드 할 때 VARIANT_WIDTHS 너비별로 원본 형식(JPEG/PNG) + WebP 를 한번씩 만들어 두고
+# 템플릿에서는 srcset으로 후보를 알려줘서 브라우저가 화면 크기에 맞는 파일만 받게 함 (templatetags/custom_tag.py)
+#
+# PostImage.variants 에 저장되는 값
+# {"source": "post/2025/10/01/a.jpg",
+#  "width": 2000, "height": 1500,
+#  "images": [{"width": 320, "format": "webp", "name": "post/2025/10/01/a_320.webp"}, ...]}
+
+VARIANT_WIDTHS = (320, 640, 1080)
+MAX_VARIANT_WIDTH = 2048
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 50
+
+CONTENT_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+# 원본 형식 : 투명도가 있으면 PNG, 나머지(JPEG, GIF, BMP ...)는 JPEG
+def fallback_format(image):
+    if image.mode in ("RGBA", "LA"):
+        return "png"
+    return "jpeg"
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == "jpeg":
+        image.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif image_format == "png":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def make_variants(field_file):
+    storage = field_file.storage
+    path = PurePosixPath(field_file.name)
+
+    with field_file.open("rb") as file:
+        # 가장 큰 후보(MAX_VARIANT_WIDTH)에 필요한 만큼만 줄여서 디코딩, 회전 정보(EXIF)도 반영 (utils/images.py)
+        image = open_image(file, (MAX_VARIANT_WIDTH, 0))
+        if image.mode not in ("RGB", "RGBA", "LA", "L"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    formats = (fallback_format(image), "webp")
+    # 원본보다 큰 너비는 만들지 않고, 가장 큰 후보로 원본 너비(최대 MAX_VARIANT_WIDTH)는 항상 포함
+    widths = sorted(
+        {width for width in VARIANT_WIDTHS if width < image.width} | {min(image.width, MAX_VARIANT_WIDTH)}
+    )
+
+    images = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+
+        for image_format in formats:
+            extension = "jpg" if image_format == "jpeg" else image_format
+            name = storage.save(
+                str(path.with_name(f"{path.stem}_{width}.{extension}")),
+                ContentFile(encode(resized, image_format)),
+            )
+            images.append({"width": width, "format": image_format, "name": name})
+
+    return {
+        "source": field_file.name,
+        "width": image.width,
+        "height": image.height,
+        "images": images,
+    }
+
+
+# 원본이 로딩되는 동안 먼저 보여줄 아주 작은(20px) 미리보기 => <img> 배경으로 바로 그려짐 (data URI, 요청 X)
+# 브라우저가 칸 크기로 늘리면서 흐릿하게 보임, 500바이트 정도라 PostImage.placeholder 에 그대로 저장
+# 투명한 부분은 흰 배경으로 채워서 JPEG으로
+def make_placeholder(field_file):
+    with field_file.open("rb") as file:
+        image = open_image(file, (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+
+    image = image.convert("RGBA")
+    background = Image.new("RGBA", image.size, "white")
+    background.alpha_composite(image)
+
+    buffer = BytesIO()
+    background.convert("RGB").save(buffer, "JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}"
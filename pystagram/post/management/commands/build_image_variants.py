@@ -0,0 +1,30 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from post.models import PostImage
+
+
+# python manage.py build_image_variants
+# 파생 이미지 기능 이전에 업로드 된 이미지들의 크기별/WebP 이미지를 만듦
+# --force : 이미 만들어진 이미지도 다시 만듦 (VARIANT_WIDTHS를 바꾼 경우 등)
+class Command(BaseCommand):
+    help = "포스트 이미지의 크기별 파생 이미지를 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true")
+
+    def handle(self, *args, **options):
+        post_images = PostImage.objects.order_by("pk")
+        if not options["force"]:
+            post_images = post_images.filter(variants={})
+
+        count = 0
+        for post_image in post_images.iterator():
+            try:
+                post_image.make_variants()
+            except (OSError, ValueError, ValidationError) as e: # 파일이 없거나 이미지가 아닌 경우, 화소 수 초과
+                self.stderr.write(f"{post_image.pk} : {e}")
+                continue
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{count}개 이미지의 파생 이미지를 만들었습니다."))
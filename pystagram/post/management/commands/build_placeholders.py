@@ -0,0 +1,49 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from post.models import PostImage
+from post.tasks import make_placeholders
+from utils.tasks import init_worker
+
+
+# python manage.py build_placeholders [--workers 4]
+# 미리보기 기능 이전에 업로드 된 이미지들의 미리보기(placeholder)를 --chunk-size개씩 나눠서 여러 프로세스로 만듦
+# 미리보기가 없는 이미지만 대상이라 중간에 멈춰도 다시 실행하면 남은 이미지부터 이어서 만듦
+# --force : 이미 있는 미리보기도 다시 만듦 (PLACEHOLDER_SIZE를 바꾼 경우 등)
+class Command(BaseCommand):
+    help = "포스트 이미지의 미리보기를 병렬로 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument("--chunk-size", type=int, default=100)
+        parser.add_argument("--force", action="store_true")
+
+    def handle(self, *args, **options):
+        post_images = PostImage.objects.exclude(image="")
+        if not options["force"]:
+            post_images = post_images.filter(placeholder="")
+        pks = list(post_images.order_by("pk").values_list("pk", flat=True))
+
+        chunk_size = options["chunk_size"]
+        chunks = [pks[i:i + chunk_size] for i in range(0, len(pks), chunk_size)]
+        made = 0
+        failed = []
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        ) as executor:
+            futures = [executor.submit(make_placeholders, chunk) for chunk in chunks]
+
+            for future in as_completed(futures):
+                chunk_made, chunk_failed = future.result()
+                made += chunk_made
+                failed += chunk_failed
+                self.stdout.write(f"~ {made}/{len(pks)}")
+
+        for pk in failed:
+            self.stderr.write(f"{pk} : 원본 이미지를 열 수 없습니다.")
+        self.stdout.write(self.style.SUCCESS(f"{made}개 이미지의 미리보기를 만들었습니다."))
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from post.models import ChunkedUpload
+
+
+# python manage.py clean_chunked_uploads [--hours 24]
+# 만든 지 --hours 시간이 지나도록 포스트에 붙지 않은 업로드와 임시 파일(.part) 삭제 (cron 등으로 주기적으로 실행)
+class Command(BaseCommand):
+    help = "오래된 이어 올리기 업로드를 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=settings.CHUNKED_UPLOAD_EXPIRE_HOURS)
+
+    def handle(self, *args, **options):
+        expired_at = timezone.now() - timedelta(hours=options["hours"])
+        # queryset.delete() 도 post_delete 시그널을 보내므로 임시 파일은 chunked_upload_delete_file 에서 삭제
+        count, _ = ChunkedUpload.objects.filter(created_at__lt=expired_at).delete()
+        self.stdout.write(self.style.SUCCESS(f"{count}개의 업로드를 삭제했습니다."))
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from member.models import UserFollowing
+from post.models import Post, Timeline
+from post.timeline import BACKFILL_SIZE, celebrity_following_ids
+
+User = get_user_model()
+
+
+# python manage.py rebuild_timeline
+# 타임라인 기능 이전에 작성된 포스트들로 유저별 Timeline을 채움
+# 유저마다 (본인 + 팔로잉) 최근 포스트 --size개
+class Command(BaseCommand):
+    help = "유저별 팔로잉 타임라인을 다시 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=BACKFILL_SIZE)
+
+    def handle(self, *args, **options):
+        size = options["size"]
+
+        for user in User.objects.order_by("pk").iterator():
+            following_ids = set(
+                UserFollowing.objects.filter(from_user=user).values_list("to_user_id", flat=True)
+            )
+            # 인기 계정 포스트는 읽을 때 가져오므로 제외
+            user_ids = (following_ids - set(celebrity_following_ids(user))) | {user.pk}
+
+            posts = (Post.objects.filter(user_id__in=user_ids)
+                     .order_by("-created_at", "-id")
+                     .values_list("pk", "created_at")[:size])
+            Timeline.objects.bulk_create(
+                [Timeline(user=user, post_id=pk, post_created_at=created_at) for pk, created_at in posts],
+                ignore_conflicts=True,
+            )
+
+        self.stdout.write(self.style.SUCCESS("타임라인을 다시 채웠습니다."))
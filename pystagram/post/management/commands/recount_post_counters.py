@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
+
+from post.models import Post, Like, Comment
+
+
+# python manage.py recount_post_counters
+# Post.like_count, Post.comment_count를 실제 Like, Comment row 수로 다시 계산
+# 한번에 전체 테이블을 UPDATE 하면 락이 길게 잡히기 때문에 id 순서로 chunk_size개씩 나눠서 처리
+def count_subquery(model):
+    counts = (model.objects.filter(post=OuterRef("pk"))
+              .order_by()
+              .values("post")
+              .annotate(count=Count("pk"))
+              .values("count"))
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "포스트의 좋아요/댓글 카운터를 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_pk = 0
+        updated = 0
+
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+
+            with transaction.atomic():
+                updated += Post.objects.filter(pk__in=pks).update(
+                    like_count=count_subquery(Like),
+                    comment_count=count_subquery(Comment),
+                )
+
+            last_pk = pks[-1]
+            self.stdout.write(f"~ post {last_pk}")
+
+        self.stdout.write(self.style.SUCCESS(f"{updated}개의 포스트 카운터를 다시 계산했습니다."))
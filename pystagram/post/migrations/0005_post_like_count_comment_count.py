@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:47
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model("post", "Post")
+    Like = apps.get_model("post", "Like")
+    Comment = apps.get_model("post", "Comment")
+
+    def count_subquery(model):
+        counts = (model.objects.filter(post=OuterRef("pk")).order_by()
+                  .values("post").annotate(count=Count("pk")).values("count"))
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Post.objects.update(like_count=count_subquery(Like), comment_count=count_subquery(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0004_post_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='댓글 수'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='좋아요 수'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
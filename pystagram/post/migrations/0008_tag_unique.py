@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+# unique 제약을 걸기 전에 대소문자만 다른 태그들을 하나로 합침
+# 가장 먼저 만들어진 태그(id가 작은 태그)를 남기고, 나머지 태그의 포스트 연결을 옮긴 뒤 삭제
+def merge_duplicate_tags(apps, schema_editor):
+    Tag = apps.get_model("post", "Tag")
+    PostTag = Tag.post.through
+
+    keepers = {}
+    for tag in Tag.objects.order_by("id"):
+        normalized = tag.tag.lower()
+        keeper = keepers.get(normalized)
+
+        if keeper is None:
+            keepers[normalized] = tag
+            if tag.tag != normalized:
+                Tag.objects.filter(pk=tag.pk).update(tag=normalized)
+            continue
+
+        post_ids = PostTag.objects.filter(tag_id=tag.pk).values_list("post_id", flat=True)
+        PostTag.objects.bulk_create(
+            [PostTag(post_id=post_id, tag_id=keeper.pk) for post_id in post_ids],
+            ignore_conflicts=True,
+        )
+        tag.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0007_timeline'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tag',
+            name='tag',
+            field=models.CharField(max_length=100, unique=True, verbose_name='태그'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0008_tag_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(verbose_name='구간 시작')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='연결 수')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trends', to='post.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='tagtrend_bucket_idx')],
+                'unique_together': {('tag', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:52
+
+import re
+
+from django.db import migrations
+
+
+# 마이그레이션 작성 시점의 utils.search.to_search_text 복사본
+# 앱 코드를 import 하면 나중에 그 함수를 고쳤을 때 예전 마이그레이션의 결과가 바뀌거나 깨지므로 그대로 고정
+HANGUL = "가-힣"
+TOKEN_RE = re.compile(rf"[{HANGUL}]+|[^\W{HANGUL}]+")
+
+
+def to_search_text(text):
+    words = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if "가" <= token[0] <= "힣" and len(token) > 1:
+            words.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            words.append(token)
+    return " ".join(words)
+
+
+# 이미 작성된 포스트들을 색인
+def index_posts(apps, schema_editor):
+    Post = apps.get_model("post", "Post")
+    cursor = schema_editor.connection.cursor()
+    for pk, content in Post.objects.values_list("pk", "content").iterator():
+        cursor.execute(
+            "INSERT INTO post_fts (rowid, body) VALUES (%s, %s)",
+            [pk, to_search_text(content)],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0009_tagtrend'),
+    ]
+
+    operations = [
+        # unicode61 : 유니코드 단어 단위 토크나이저, remove_diacritics 2 : é => e 처럼 악센트 무시
+        migrations.RunSQL(
+            "CREATE VIRTUAL TABLE post_fts USING fts5(body, tokenize = 'unicode61 remove_diacritics 2')",
+            "DROP TABLE post_fts",
+        ),
+        migrations.RunPython(index_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0010_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, verbose_name='크기별 이미지'),
+        ),
+    ]
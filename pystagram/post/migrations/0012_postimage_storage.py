@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:03
+
+import utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0011_postimage_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='postimage',
+            name='image',
+            field=models.ImageField(storage=utils.storage.media_storage, upload_to='post/%Y/%m/%d', verbose_name='이미지'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:07
+
+import utils.images
+import utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0012_postimage_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='postimage',
+            name='image',
+            field=models.ImageField(storage=utils.storage.media_storage, upload_to='post/%Y/%m/%d', validators=[utils.images.validate_image_pixels], verbose_name='이미지'),
+        ),
+    ]
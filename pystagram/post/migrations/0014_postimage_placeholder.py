@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0013_image_pixel_validator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimage',
+            name='placeholder',
+            field=models.TextField(blank=True, default='', verbose_name='미리보기'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:13
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0014_postimage_placeholder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='작성일자')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일자')),
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('filename', models.CharField(max_length=255, verbose_name='파일 이름')),
+                ('size', models.PositiveBigIntegerField(verbose_name='전체 크기')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '나눠 올리는 이미지',
+                'verbose_name_plural': '나눠 올리는 이미지 목록',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0015_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='sha256',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='sha256'),
+        ),
+    ]
@@ -1,17 +1,33 @@
 import re
+import uuid
+from functools import partial
+from pathlib import Path
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 
+from post.images import make_variants
+from utils.images import validate_image_pixels
 from utils.models import TimeStampModel
+from utils.storage import media_storage
+from utils.tasks import enqueue
 
 User = get_user_model()
 
 class Post(TimeStampModel):
     content = models.TextField("본문")
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # 좋아요/댓글 수를 매번 COUNT 하거나 전부 prefetch 하지 않도록 저장해두는 카운터
+    # toggle_like, CommentCreateView에서 F() 표현식으로 DB에서 바로 +1/-1 (동시 요청에도 안전)
+    # 어긋났을 때는 python manage.py recount_post_counters 로 다시 계산
+    like_count = models.PositiveIntegerField("좋아요 수", default=0)
+    comment_count = models.PositiveIntegerField("댓글 수", default=0)
 
     def __str__(self):
         return f"[{self.user}] post" # User 모델에 def __str__ 에서 정의된 nickname 가져옴
@@ -19,20 +35,97 @@ class Post(TimeStampModel):
     class Meta:
         verbose_name = "포스트"
         verbose_name_plural = f"{verbose_name} 목록"
+        # 피드 커서 페이지네이션((created_at, id) 기준)용 인덱스
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="post_created_at_id_idx"),
+        ]
 
 
 class PostImage(TimeStampModel):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="images") # related_name 기본값 : "postimage_set"
-    image = models.ImageField("이미지", upload_to="post/%Y/%m/%d")
+    # storage=media_storage : 같은 사진은 파일 하나로 저장하는 내용 기반 저장소 (utils/storage.py)
+    image = models.ImageField("이미지", upload_to="post/%Y/%m/%d", storage=media_storage,
+                              validators=[validate_image_pixels])
+    # 크기별(320/640/1080) JPEG/PNG + WebP 파생 이미지 목록 (post/images.py)
+    variants = models.JSONField("크기별 이미지", default=dict, blank=True)
+    # 원본이 로딩되기 전에 보여줄 20px 미리보기 (data URI, post/images.py)
+    placeholder = models.TextField("미리보기", default="", blank=True)
 
     def __str__(self):
         return f"{self.post} image" # User의 def __str__ 에서 정의된 nickname
 
+    # 원본 파일이 저장된 다음에(이름이 upload_to로 확정된 다음에) 미리보기와 파생 이미지를 만듦
+    # 원본을 열고 인코딩하는 데 수 초가 걸릴 수 있어서 커밋된 다음 백그라운드에서 (post/tasks.py)
+    # => 만들어지기 전까지는 미리보기, srcset 없이 원본을 보여줌 (templatetags/custom_tag.py)
+    # 이미지가 바뀌지 않은 저장(다른 필드만 수정)에서는 다시 만들지 않음
+    def save(self, *args, **kwargs):
+        replaced_image = self.get_replaced_image()
+        super().save(*args, **kwargs)
+
+        # 이미지를 바꾼 경우 예전 이미지 파일 삭제 (내용 기반 저장소에서는 참조 수 -1)
+        if replaced_image:
+            transaction.on_commit(partial(self.image.storage.delete, replaced_image))
+
+        if self.image and self.variants.get("source") != self.image.name:
+            from post.tasks import make_placeholders, make_post_image_variants
+            transaction.on_commit(partial(enqueue, make_placeholders, [self.pk]))
+            transaction.on_commit(partial(enqueue, make_post_image_variants, self.pk))
+
+    # 새 파일을 올려서 저장하는 경우 DB에 저장되어 있던 예전 이미지 이름
+    def get_replaced_image(self):
+        if self.pk is None or (self.image and self.image._committed):
+            return None
+        return PostImage.objects.filter(pk=self.pk).values_list("image", flat=True).first() or None
+
+    def get_variant_names(self):
+        return [image["name"] for image in self.variants.get("images", [])]
+
+    def make_variants(self):
+        old_names = self.get_variant_names()
+        self.variants = make_variants(self.image)
+        # 만드는 동안 이미지가 바뀌었으면(수정) 예전 이미지의 파생 이미지는 저장하지 않고 지움
+        updated = PostImage.objects.filter(pk=self.pk, image=self.image.name).update(variants=self.variants)
+
+        storage = self.image.storage
+        for name in old_names if updated else self.get_variant_names():
+            transaction.on_commit(partial(storage.delete, name))
+
     class Meta:
         verbose_name = "이미지"
         verbose_name_plural = f"{verbose_name} 목록"
 
 
+# 나눠서 올리는 이미지 (post/upload_views.py)
+# 모바일처럼 끊기기 쉬운 연결에서 사진 여러장을 한 요청으로 올리다 실패하면 처음부터 다시 올려야 하므로
+# 파일마다 업로드를 만들고 조각(chunk)을 offset과 함께 이어 붙임 => 끊기면 받은 곳(offset)부터 다시
+# 받는 중인 파일은 CHUNKED_UPLOAD_DIR/<upload_id>.part, 받은 크기(offset)는 이 파일 크기
+# 다 받은 업로드들은 한 트랜잭션에서 포스트 이미지(PostImage)로 붙이고 지움
+class ChunkedUpload(TimeStampModel):
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    filename = models.CharField("파일 이름", max_length=255)
+    size = models.PositiveBigIntegerField("전체 크기")
+    # 다 받았을 때의 파일 내용 sha256 (조각을 받으면서 계산, post/upload_views.py) => 저장소에서 다시 읽지 않음
+    sha256 = models.CharField("sha256", max_length=64, blank=True, default="")
+
+    def __str__(self):
+        return f"{self.user} {self.filename}"
+
+    @property
+    def path(self):
+        return Path(settings.CHUNKED_UPLOAD_DIR, f"{self.upload_id}.part")
+
+    def get_offset(self):
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    class Meta:
+        verbose_name = "나눠 올리는 이미지"
+        verbose_name_plural = f"{verbose_name} 목록"
+
+
 # Post
     # 이미지(여러개)
     # 글
@@ -42,22 +135,75 @@ class PostImage(TimeStampModel):
 
 
 # 태그 : 태그와 포스트는 N:M 관계
+# 태그는 소문자로 통일해서 저장 (#Django, #django 는 같은 태그)
+def normalize_tag(tag):
+    return tag.lower()
+
+
+# 태그 검색 첫 페이지 캐시 키 (태그가 포스트에 연결/해제되면 삭제)
+def tag_page_cache_key(tag):
+    return f"tag_page:{tag}"
+
+
 class Tag(TimeStampModel):
-    tag = models.CharField("태그", max_length=100)
+    tag = models.CharField("태그", max_length=100, unique=True)
     post = models.ManyToManyField(Post, related_name="tags") # 중간 테이블 name은 "tags"로 설정
 
     def __str__(self):
         return self.tag
 
+
+# 실시간 인기 태그용 시간 구간(bucket)별 카운터
+# bucket : 구간 시작 시각 (5분 단위), count : 그 구간 동안 포스트에 연결된 횟수
+# 최근 1시간/24시간 순위는 M2M 테이블을 훑지 않고 최근 bucket들만 더해서 계산 => post/trending.py
+class TagTrend(models.Model):
+    tag = models.ForeignKey(Tag, related_name="trends", on_delete=models.CASCADE)
+    bucket = models.DateTimeField("구간 시작")
+    count = models.PositiveIntegerField("연결 수", default=0)
+
+    def __str__(self):
+        return f"[trend]{self.tag} | {self.bucket}"
+
+    class Meta:
+        unique_together = ("tag", "bucket")
+        indexes = [
+            models.Index(fields=["bucket"], name="tagtrend_bucket_idx"),
+        ]
+
 # 댓글
 class Comment(TimeStampModel):
     post = models.ForeignKey(Post, related_name="comments", on_delete=models.CASCADE)
     content = models.CharField("내용", max_length=255)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    # 최신 댓글 순서 (created_at, id 내림차순) => 피드 미리보기, "댓글 더보기" 커서 페이지네이션에 같이 사용
+    ORDERING = ("-created_at", "-id")
+
     def __str__(self):
         return f"[comment]{self.post} | {self.user}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["post", "-created_at", "-id"], name="comment_post_created_at_idx"),
+        ]
+
+
+# 포스트마다 최신 댓글 size개만 prefetch (포스트.latest_comments 에 리스트로 담김)
+# ROW_NUMBER() OVER (PARTITION BY post_id ORDER BY created_at DESC, id DESC) <= size
+# => 댓글이 수천개인 포스트도 피드에는 size개만 가져옴
+def latest_comments_prefetch(size):
+    comments = (
+        Comment.objects.select_related("user")
+        .annotate(row_number=Window(
+            RowNumber(),
+            partition_by=F("post_id"),
+            order_by=[F("created_at").desc(), F("id").desc()],
+        ))
+        .filter(row_number__lte=size)
+        .order_by(*Comment.ORDERING)
+    )
+    return Prefetch("comments", queryset=comments, to_attr="latest_comments")
+
 
 class Like(TimeStampModel):
     post = models.ForeignKey(Post, related_name="likes", on_delete=models.CASCADE)
@@ -66,26 +212,137 @@ class Like(TimeStampModel):
     def __str__(self):
         return f"[like]{self.post} | {self.user}"
 
+# 팔로잉 피드용 타임라인 (fan-out-on-write)
+# 포스트가 작성될 때 작성자 + 팔로워들의 타임라인에 row를 미리 넣어둠
+# 피드를 볼 때는 JOIN 없이 user로 인덱스 범위 스캔 한번 => post/timeline.py
+# post_created_at : 정렬 키로 쓰기 위해 포스트의 created_at을 복사해둔 값
+class Timeline(models.Model):
+    user = models.ForeignKey(User, related_name="timeline", on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, related_name="+", on_delete=models.CASCADE)
+    post_created_at = models.DateTimeField("포스트 작성일자")
+
+    def __str__(self):
+        return f"[timeline]{self.user} | {self.post}"
+
+    class Meta:
+        unique_together = ("user", "post")
+        indexes = [
+            models.Index(fields=["user", "-post_created_at", "-post"], name="timeline_user_created_at_idx"),
+        ]
+
 # @receiver : 특정 이벤트(시그널)이 발생했을 때, 어떤 함수를 자동으로 실행해라
 # post_save : 세이브(저장)하고 난후 @receiver 함수 호출 여기선 Post모델이 저장되고 난 이후에
 # pre_save : 세이브(저장)하기 전에 @receiver 함수 호출
 # r"#(\w{1,100})(?=\s|$)" → # 뒤에 오는 1~100자 단어를 찾고, 공백이나 문장 끝에서 멈춤
 @receiver(post_save, sender=Post)
 def post_post_save(sender, instance, created, **kwargs):
-    hashtags = re.findall(r"#(\w{1,100})(?=\s|$)", instance.content) # 여기서 instance.content는 Post 모델에 content
+    added, removed = sync_post_tags(instance)
 
-    # clear() → 예전 태그 스티커 싹 떼기 : 해시태그는 수정,삭제 될수도 있기 때문에
-    instance.tags.clear() # 연결 되어있는 tags 중계 모델을 삭제 (중간 테이블에서 연결만 지우는 것, Tag 자체는 삭제 안 함)
+    # 메모리 인덱스는 롤백되지 않으므로 커밋된 다음에 반영
+    from post.tag_index import tag_index
+    if added or removed:
+        transaction.on_commit(partial(tag_index.update, added, removed))
 
-    # get_or_create : 해당 태그가 DB에 있으면 가져오고, 없으면 새로 만든다
-    # 반환값은 (Tag객체, created여부(True, False)) 튜플
-    if hashtags:
-        tags = [
-            Tag.objects.get_or_create(tag=hashtag)
-            for hashtag in hashtags
-        ]
-        # 반환값은 (Tag객체, created여부(True, False)) 튜플이므로 안쓰는 값(bool)는 _ 이렇게 표현해서 Tag만 추출
-        tags = [tag for tag, _ in tags]
+    if added or removed:
+        cache.delete_many([tag_page_cache_key(tag) for tag in added | removed])
+
+    if added:
+        from post.trending import record_tag_uses
+        record_tag_uses(added)
+
+
+# 본문의 해시태그와 지금 연결된 태그를 비교해서 바뀐 부분(추가/삭제)만 DB에 반영
+# 예전 방식(clear() 후 태그마다 get_or_create)은 태그 30개짜리 포스트를 수정하면 쿼리가 60개 이상,
+# 태그가 그대로여도 중간 테이블을 전부 지웠다 다시 씀
+# 지금은 태그 수와 상관없이 최대 5번의 쿼리 (현재 연결 조회, 연결 삭제, 태그 생성, 태그 조회, 연결 생성)
+# 반환값 : (추가된 태그 set, 삭제된 태그 set)
+def sync_post_tags(post):
+    hashtags = {
+        normalize_tag(hashtag)
+        for hashtag in re.findall(r"#(\w{1,100})(?=\s|$)", post.content) # 여기서 post.content는 Post 모델에 content
+    }
+    PostTag = Tag.post.through # 태그 <-> 포스트 중간 테이블
+
+    with transaction.atomic():
+        # {태그: 태그 id} 지금 이 포스트에 연결되어 있는 태그
+        linked = dict(post.tags.values_list("tag", "id"))
+
+        added = hashtags - linked.keys()
+        removed = linked.keys() - hashtags
+
+        if removed:
+            PostTag.objects.filter(post_id=post.pk, tag_id__in=[linked[tag] for tag in removed]).delete()
+
+        if added:
+            # ignore_conflicts : 이미 있는 태그는 unique 제약에 걸려서 무시됨 => get_or_create를 한번에
+            Tag.objects.bulk_create([Tag(tag=tag) for tag in added], ignore_conflicts=True)
+            tag_ids = Tag.objects.filter(tag__in=added).values_list("id", flat=True)
+            PostTag.objects.bulk_create(
+                [PostTag(post_id=post.pk, tag_id=tag_id) for tag_id in tag_ids],
+                ignore_conflicts=True,
+            )
+
+    return added, removed
+
+
+# 새 포스트를 작성자 + 팔로워 타임라인에 뿌려줌 (수정할 때는 created=False 라서 실행 안됨)
+# 작성자 본인 타임라인은 row 하나라서 바로, 팔로워들은 커밋된 다음 백그라운드에서 (post/tasks.py)
+@receiver(post_save, sender=Post)
+def post_fan_out(sender, instance, created, **kwargs):
+    if created:
+        from post.tasks import fan_out_post
+        from post.timeline import add_to_timelines
+        add_to_timelines(instance, [instance.user_id])
+        transaction.on_commit(partial(enqueue, fan_out_post, instance.pk))
+
+
+# 작성자의 post_count 증감
+@receiver(post_save, sender=Post)
+def post_count_up(sender, instance, created, **kwargs):
+    if created:
+        User.objects.filter(pk=instance.user_id).update(post_count=F("post_count") + 1)
+
+
+@receiver(post_delete, sender=Post)
+def post_count_down(sender, instance, **kwargs):
+    User.objects.filter(pk=instance.user_id, post_count__gt=0).update(post_count=F("post_count") - 1)
+
+
+# 본문 전문 검색 색인(post_fts) 동기화
+@receiver(post_save, sender=Post)
+def post_index_content(sender, instance, **kwargs):
+    from post.search import index_post
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_unindex_content(sender, instance, **kwargs):
+    from post.search import unindex_post
+    unindex_post(instance.pk)
+
+
+# 포스트 이미지가 삭제되면(포스트 삭제 CASCADE 포함) 원본과 파생 이미지 파일도 삭제 (커밋된 다음에)
+@receiver(post_delete, sender=PostImage)
+def post_image_delete_files(sender, instance, **kwargs):
+    storage = instance.image.storage
+    for name in [instance.image.name] + instance.get_variant_names():
+        if name:
+            transaction.on_commit(partial(storage.delete, name))
+
+
+# 이어 올리기가 끝나서(포스트에 붙임) 또는 오래돼서 지워진 업로드의 임시 파일 삭제
+@receiver(post_delete, sender=ChunkedUpload)
+def chunked_upload_delete_file(sender, instance, **kwargs):
+    transaction.on_commit(partial(instance.path.unlink, missing_ok=True))
+
+
+# 포스트가 지워지면 연결돼 있던 태그들의 검색 첫 페이지 캐시도 삭제하고, 자동완성 인덱스의 포스트 수 -1 (커밋된 다음에)
+# (post_delete 시점에는 중간 테이블 row가 이미 지워져 있어서 pre_delete에서 처리)
+@receiver(pre_delete, sender=Post)
+def post_pre_delete(sender, instance, **kwargs):
+    tags = list(instance.tags.values_list("tag", flat=True))
+    cache.delete_many([tag_page_cache_key(tag) for tag in tags])
 
-        # add() → 새로 분석한 태그 스티커 다시 붙이기
-        instance.tags.add(*tags) # 위에서 새로 추출한 태그들을 Post에 새로 연결
+    from post.tag_index import tag_index
+    if tags:
+        transaction.on_commit(partial(tag_index.update, removed=tags))
@@ -0,0 +1,36 @@
+from django.db import connection
+
+from utils.search import to_search_text, to_match_query
+
+# 포스트 본문 전문 검색 (SQLite FTS5)
+# post_fts : rowid = 포스트 id, body = to_search_text(본문) 한글 bigram 색인 텍스트 (migrations/0010_post_fts.py)
+# Post가 저장/삭제될 때 시그널로 같이 반영 (post/models.py)
+# => content__icontains 로 post_post 전체를 훑는 일 없이 색인에서 찾고 bm25 점수 순으로 정렬
+
+
+def index_post(post):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM post_fts WHERE rowid = %s", [post.pk])
+        cursor.execute(
+            "INSERT INTO post_fts (rowid, body) VALUES (%s, %s)",
+            [post.pk, to_search_text(post.content)],
+        )
+
+
+def unindex_post(post_pk):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM post_fts WHERE rowid = %s", [post_pk])
+
+
+# bm25 : 값이 작을수록 관련도가 높음
+def search_post_ids(q, limit, offset=0):
+    match_query = to_match_query(q)
+    if not match_query:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM post_fts WHERE post_fts MATCH %s ORDER BY bm25(post_fts) LIMIT %s OFFSET %s",
+            [match_query, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,108 @@
+import bisect
+import heapq
+import threading
+import time
+from array import array
+
+from django.db.models import Count
+
+# 해시태그 자동완성용 메모리 인덱스
+#
+# tags : 정렬된 태그 문자열 리스트, counts : 같은 위치 태그의 포스트 수 (array로 숫자만 촘촘하게 저장)
+# "py"로 시작하는 태그 = bisect로 찾은 [lo, hi) 구간 => 키 입력마다 DB의 LIKE 'py%' 스캔 없이 마이크로초 단위
+# 처음 사용할 때 DB에서 한번 읽어오고, 이후에는 태그가 연결/해제될 때(post_post_save) 바로 반영
+# 여러 프로세스(워커)로 띄운 경우 다른 프로세스의 변경은 REBUILD_SECONDS 마다 다시 읽어서 반영
+#
+# 1~2글자 prefix는 구간이 인덱스 대부분이라 키 입력마다 구간 전체를 훑지 않도록 상위 TOP_K개를 top에 저장
+# 포스트 수가 늘면 그 자리에서 순위를 고치고, 상위 태그의 포스트 수가 줄면 그 prefix만 버렸다가 다음 조회 때 다시 계산
+
+REBUILD_SECONDS = 60 * 10
+SHORT_PREFIX_LENGTH = 2
+TOP_K = 10
+MAX_CHAR = "\U0010ffff" # 유니코드에서 가장 큰 문자 => prefix + MAX_CHAR 는 prefix로 시작하는 모든 문자열보다 큼
+
+
+class TagPrefixIndex:
+    def __init__(self):
+        self.tags = []
+        self.counts = array("q")
+        self.top = {} # 짧은 prefix => [(태그, 포스트 수), ...] 포스트 수가 많은 순 TOP_K개
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        from post.models import Tag
+
+        rows = (Tag.objects.annotate(post_count=Count("post"))
+                .order_by("tag")
+                .values_list("tag", "post_count"))
+        tags = []
+        counts = array("q")
+        for tag, post_count in rows.iterator():
+            tags.append(tag)
+            counts.append(post_count)
+
+        with self.lock:
+            self.tags, self.counts = tags, counts
+            self.top = {}
+            self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > REBUILD_SECONDS:
+            self.load()
+
+    # 태그별 포스트 수 변화를 반영 (처음 보는 태그는 정렬 위치에 끼워 넣음)
+    def update(self, added=(), removed=()):
+        if self.loaded_at is None:
+            return
+
+        with self.lock:
+            for tag, diff in [(tag, 1) for tag in added] + [(tag, -1) for tag in removed]:
+                index = bisect.bisect_left(self.tags, tag)
+                if index < len(self.tags) and self.tags[index] == tag:
+                    self.counts[index] = max(self.counts[index] + diff, 0)
+                elif diff > 0:
+                    self.tags.insert(index, tag)
+                    self.counts.insert(index, diff)
+                else:
+                    continue
+                self.update_top(tag, self.counts[index], diff)
+
+    def update_top(self, tag, count, diff):
+        for prefix in {tag[:length] for length in range(1, SHORT_PREFIX_LENGTH + 1)}:
+            top = self.top.get(prefix)
+            if top is None:
+                continue
+
+            others = [(other, other_count) for other, other_count in top if other != tag]
+            if diff > 0:
+                # 목록 밖의 태그는 모두 목록의 마지막 태그보다 포스트 수가 적으므로 새 값만 넣고 다시 정렬하면 됨
+                self.top[prefix] = sorted(others + [(tag, count)], key=lambda item: (-item[1], item[0]))[:TOP_K]
+            elif len(others) < len(top):
+                # 목록 안의 태그가 줄어들면 목록 밖의 태그에게 자리가 밀릴 수 있으므로 다음 조회 때 다시 계산
+                del self.top[prefix]
+
+    # tags[lo:hi] 중 포스트 수가 많은 순으로 limit개 (같으면 가나다/알파벳 순)
+    # 포스트가 모두 지워지거나 수정으로 빠진 태그(포스트 수 0)는 보여주지 않음
+    def scan(self, lo, hi, limit):
+        top = heapq.nlargest(limit, range(lo, hi), key=lambda index: (self.counts[index], -index))
+        return [(self.tags[index], self.counts[index]) for index in top if self.counts[index] > 0]
+
+    # prefix로 시작하는 태그 중 포스트 수가 많은 순으로 limit개
+    def complete(self, prefix, limit=10):
+        self.ensure_loaded()
+
+        with self.lock:
+            short = 0 < len(prefix) <= SHORT_PREFIX_LENGTH and limit <= TOP_K
+            if short and prefix in self.top:
+                return self.top[prefix][:limit]
+
+            lo = bisect.bisect_left(self.tags, prefix)
+            hi = bisect.bisect_left(self.tags, prefix + MAX_CHAR, lo)
+            if short:
+                self.top[prefix] = self.scan(lo, hi, TOP_K)
+                return self.top[prefix][:limit]
+            return self.scan(lo, hi, limit)
+
+
+tag_index = TagPrefixIndex()
@@ -0,0 +1,58 @@
+import logging
+
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# 포스트 백그라운드 작업 : 저장이 커밋된 다음 utils/tasks.py 의 enqueue 로 실행
+# (팔로워 타임라인 fan-out, 미리보기/파생 이미지 인코딩)
+# 워커 프로세스에서 실행될 수 있으므로 pk만 받아서 DB에서 다시 읽음
+
+
+# 워커 프로세스에서 실행 : 새 포스트를 팔로워들의 타임라인에 추가
+def fan_out_post(post_pk):
+    from post.models import Post
+    from post.timeline import fan_out_to_followers
+
+    post = Post.objects.filter(pk=post_pk).first()
+    if post is not None: # 커밋된 다음 바로 삭제된 경우
+        fan_out_to_followers(post)
+
+
+# 워커 프로세스에서 실행 : 포스트 이미지의 크기별 파생 이미지를 만듦 (PostImage.save)
+# 그 사이에 지워졌거나 이미 만들어진 경우는 건너뜀
+# 원본을 열 수 없으면 로그만 남김 => 원본 이미지만 보여주고, python manage.py build_image_variants 로 다시 만들 수 있음
+def make_post_image_variants(post_image_pk):
+    from post.models import PostImage
+
+    post_image = PostImage.objects.filter(pk=post_image_pk).exclude(image="").first()
+    if post_image is None or post_image.variants.get("source") == post_image.image.name:
+        return
+
+    try:
+        post_image.make_variants()
+    except (OSError, ValueError, ValidationError) as e: # 원본 파일이 없거나 이미지가 아닌 경우, 화소 수 초과
+        logger.error("포스트 이미지 %s 파생 이미지 생성 실패 : %s", post_image_pk, e)
+
+
+# 워커 프로세스에서 실행 (PostImage.save, build_placeholders 커맨드)
+# pks 의 미리보기(placeholder)를 만듦
+# 만드는 동안 이미지가 바뀌었으면(수정) 예전 이미지의 미리보기는 저장하지 않음
+# 반환값 : (만든 수, 실패한 pk 리스트)
+def make_placeholders(pks):
+    from post.images import make_placeholder
+    from post.models import PostImage
+
+    made = 0
+    failed = []
+    for post_image in PostImage.objects.filter(pk__in=pks).exclude(image=""):
+        try:
+            placeholder = make_placeholder(post_image.image)
+        except (OSError, ValueError, ValidationError): # 원본 파일이 없거나 이미지가 아닌 경우, 화소 수 초과
+            failed.append(post_image.pk)
+            continue
+
+        PostImage.objects.filter(pk=post_image.pk, image=post_image.image.name).update(placeholder=placeholder)
+        made += 1
+
+    return made, failed
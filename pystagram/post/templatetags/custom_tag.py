@@ -1,10 +1,65 @@
 from django import template
+from django.utils.html import format_html, format_html_join
+
+from post.images import CONTENT_TYPES
+from utils import resize
 
 register = template.Library()
 
+# liked_post_ids : PostListView에서 한번에 조회한 "내가 좋아요 누른 포스트 id" set
 @register.simple_tag()
-def add_like_class(user, likes):
-    for like_obj in likes:
-        if like_obj.user == user:
-            return ' text-danger'
+def add_like_class(post, liked_post_ids):
+    if post.pk in liked_post_ids:
+        return ' text-danger'
     return ''
+
+
+def build_srcset(storage, images):
+    return ", ".join(f"{storage.url(image['name'])} {image['width']}w" for image in images)
+
+
+# 원본이 로딩되기 전까지 <img> 배경으로 보여줄 미리보기 (post/images.py make_placeholder)
+# object-fit: cover 인 .post-image 와 같은 위치/비율로 채움
+def placeholder_style(post_image):
+    if not post_image.placeholder:
+        return ""
+    return format_html(' style="background: center / cover no-repeat url({})"', post_image.placeholder)
+
+
+# {% responsive_image post_image "(min-width: 992px) 17vw, 28vw" %}
+# sizes : 화면에서 이미지가 차지하는 너비 => 브라우저가 srcset 중 그 너비에 맞는 파일 하나만 받음
+# WebP를 지원하는 브라우저는 <source>의 WebP, 아니면 <img>의 JPEG/PNG
+# 파생 이미지가 아직 없는 이미지(기능 이전 업로드, 백그라운드에서 만드는 중)는 원본 그대로
+# 미리보기(placeholder)가 있으면 원본을 받는 동안 흐린 미리보기가 먼저 보임
+@register.simple_tag()
+def responsive_image(post_image, sizes, css_class="img-fluid post-image"):
+    variants = post_image.variants
+    if not variants.get("images"):
+        return format_html(
+            '<img class="{}" src="{}" alt="" loading="lazy"{}>',
+            css_class, post_image.image.url, placeholder_style(post_image),
+        )
+
+    storage = post_image.image.storage
+    images_by_format = {}
+    for image in variants["images"]:
+        images_by_format.setdefault(image["format"], []).append(image)
+
+    fallback = [images for image_format, images in images_by_format.items() if image_format != "webp"][0]
+    sources = format_html_join(
+        "", '<source type="{}" srcset="{}" sizes="{}">',
+        ((CONTENT_TYPES[image_format], build_srcset(storage, images), sizes)
+         for image_format, images in images_by_format.items() if image_format == "webp"),
+    )
+    return format_html(
+        '<picture>{}<img class="{}" src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="" loading="lazy"{}></picture>',
+        sources, css_class, storage.url(fallback[-1]["name"]), build_srcset(storage, fallback), sizes,
+        variants["width"], variants["height"], placeholder_style(post_image),
+    )
+
+
+# {% resize_url post_image.image 160 160 %} => 160x160으로 잘라낸 이미지의 서명된 주소 (utils/resize.py)
+# height를 생략하면 너비만 맞추고 비율 유지
+@register.simple_tag()
+def resize_url(field_file, width, height=0):
+    return resize.resize_url(field_file.name, width, height)
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from member.models import UserFollowing
+from post.models import Post, Timeline
+from utils.pagination import CursorPaginator, CursorPage
+
+User = get_user_model()
+
+# 팔로잉 피드 (fan-out-on-write + 인기 계정은 pull 하는 하이브리드)
+#
+# 쓰기 : 포스트가 작성되면 작성자와 팔로워 전원의 Timeline에 row를 넣음 (팔로워는 커밋된 다음 백그라운드에서)
+# 읽기 : Timeline.objects.filter(user=나) 를 (post_created_at, post) 순으로 인덱스 범위 스캔
+# 팔로워가 TIMELINE_FANOUT_LIMIT 보다 많은 계정은 포스트 하나에 row 수십만개를 쓰게 되므로 fan-out 하지 않고,
+# 읽을 때 그 계정들의 포스트만 따로 가져와(pull) 타임라인과 합쳐서 보여줌
+
+TIMELINE_ORDERING = ("-post_created_at", "-post")
+FAN_OUT_BATCH_SIZE = 1000
+BACKFILL_SIZE = 50 # 새로 팔로우 했을 때 타임라인에 채워줄 최근 포스트 수
+
+
+def is_celebrity(user_id):
+    return User.objects.filter(pk=user_id, follower_count__gt=settings.TIMELINE_FANOUT_LIMIT).exists()
+
+
+# 내가 팔로우 하는 계정 중 팔로워 수가 TIMELINE_FANOUT_LIMIT 보다 많은 계정 id
+def celebrity_following_ids(user):
+    return list(
+        User.objects.filter(followers=user, follower_count__gt=settings.TIMELINE_FANOUT_LIMIT)
+        .values_list("pk", flat=True)
+    )
+
+
+def add_to_timelines(post, user_ids):
+    entries = [
+        Timeline(user_id=user_id, post_id=post.pk, post_created_at=post.created_at)
+        for user_id in user_ids
+    ]
+    Timeline.objects.bulk_create(entries, batch_size=FAN_OUT_BATCH_SIZE, ignore_conflicts=True)
+
+
+# 팔로워 타임라인에 추가 : 팔로워가 많으면(최대 TIMELINE_FANOUT_LIMIT명) 오래 걸리므로
+# 포스트 작성 요청 안에서 하지 않고 커밋된 다음 백그라운드(post/tasks.py fan_out_post)에서 실행
+def fan_out_to_followers(post):
+    if is_celebrity(post.user_id):
+        return
+
+    follower_ids = (UserFollowing.objects.filter(to_user_id=post.user_id)
+                    .values_list("from_user_id", flat=True))
+
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=FAN_OUT_BATCH_SIZE):
+        batch.append(follower_id)
+        if len(batch) >= FAN_OUT_BATCH_SIZE:
+            add_to_timelines(post, batch)
+            batch = []
+    if batch:
+        add_to_timelines(post, batch)
+
+
+# 팔로우 시작 : 상대방의 최근 포스트를 내 타임라인에 채워줌
+def backfill_following(user, to_user):
+    for post in Post.objects.filter(user=to_user).order_by("-created_at", "-id")[:BACKFILL_SIZE]:
+        add_to_timelines(post, [user.pk])
+
+
+# 팔로우 취소 : 내 타임라인에서 상대방 포스트 제거
+def remove_following(user, to_user):
+    Timeline.objects.filter(user=user, post__user=to_user).delete()
+
+
+# queryset : 피드에 보여줄 포스트 queryset (select_related, prefetch_related 가 걸려있는 상태)
+# cursor는 전체 피드와 같은 (created_at, id) 키 공간을 사용
+def get_timeline_page(user, queryset, per_page, cursor=None):
+    post_paginator = CursorPaginator(queryset, per_page)
+    timeline_paginator = CursorPaginator(Timeline.objects.filter(user=user), per_page, TIMELINE_ORDERING)
+
+    entries = timeline_paginator.queryset
+    pulled = Post.objects.filter(user_id__in=celebrity_following_ids(user)).order_by("-created_at", "-id")
+    if cursor:
+        values = post_paginator.decode_cursor(cursor)
+        entries = entries.filter(timeline_paginator.after(values))
+        pulled = pulled.filter(post_paginator.after(values))
+
+    # 두 목록에서 각각 per_page + 1개씩 가져와 합친 뒤 정렬
+    keys = set(entries.values_list("post_created_at", "post_id")[:per_page + 1])
+    keys |= set(pulled.values_list("created_at", "id")[:per_page + 1])
+    keys = sorted(keys, reverse=True)
+
+    has_next = len(keys) > per_page
+    post_ids = [post_id for _, post_id in keys[:per_page]]
+    posts = queryset.filter(pk__in=post_ids).in_bulk()
+    object_list = [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    next_cursor = None
+    if has_next and object_list:
+        next_cursor = post_paginator.encode_cursor(object_list[-1])
+
+    return CursorPage(object_list, next_cursor)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from post.models import Tag, TagTrend
+
+# 실시간 인기 태그 (sliding window)
+#
+# 태그가 포스트에 연결될 때마다 현재 5분 구간(bucket)의 카운터를 +1
+# 순위는 최근 1시간(12개 구간) / 24시간(288개 구간)의 카운터 합계로 계산
+# 계산 결과는 캐시에 TRENDING_CACHE_TIMEOUT초 동안 저장해서 요청마다 집계하지 않음
+# 오래된 카운터 정리는 쓰기(record_tag_uses)에서 프로세스마다 구간이 바뀔 때 한번 => 조회(GET)는 DB에 쓰지 않음
+
+BUCKET_SECONDS = 60 * 5
+TRENDING_WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+}
+TRENDING_CACHE_TIMEOUT = 60
+
+last_pruned_bucket = None
+
+
+# 12:07:31 => 12:05:00
+def get_bucket(now=None):
+    now = now or timezone.now()
+    timestamp = int(now.timestamp())
+    return datetime.fromtimestamp(timestamp - timestamp % BUCKET_SECONDS, tz=dt_timezone.utc)
+
+
+def record_tag_uses(tag_names):
+    bucket = get_bucket()
+    tag_ids = list(Tag.objects.filter(tag__in=tag_names).values_list("id", flat=True))
+
+    # 이번 구간 카운터가 없으면 0으로 만들어 두고, 있든 없든 UPDATE count = count + 1
+    TagTrend.objects.bulk_create(
+        [TagTrend(tag_id=tag_id, bucket=bucket) for tag_id in tag_ids],
+        ignore_conflicts=True,
+    )
+    TagTrend.objects.filter(tag_id__in=tag_ids, bucket=bucket).update(count=F("count") + 1)
+    prune_buckets(bucket)
+
+
+# 가장 긴 구간(24시간)보다 오래된 카운터는 더 이상 쓰이지 않으므로 정리
+def prune_buckets(bucket):
+    global last_pruned_bucket
+    if bucket == last_pruned_bucket:
+        return
+    last_pruned_bucket = bucket
+    TagTrend.objects.filter(bucket__lte=bucket - max(TRENDING_WINDOWS.values())).delete()
+
+
+def get_trending_tags(window="1h", limit=10):
+    cache_key = f"trending_tags:{window}:{limit}"
+    trending_tags = cache.get(cache_key)
+
+    if trending_tags is None:
+        since = get_bucket() - TRENDING_WINDOWS[window]
+        trending_tags = list(
+            TagTrend.objects.filter(bucket__gt=since)
+            .values("tag__tag")
+            .annotate(total=Sum("count"))
+            .order_by("-total", "tag__tag")
+            .values_list("tag__tag", "total")[:limit]
+        )
+        cache.set(cache_key, trending_tags, TRENDING_CACHE_TIMEOUT)
+
+    return trending_tags
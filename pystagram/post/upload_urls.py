@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import upload_views as views
+
+app_name = "upload"
+
+urlpatterns = [
+    path('', views.upload_create, name="create"),
+    path('attach/', views.upload_attach, name="attach"),
+    path('<uuid:upload_id>/', views.upload_detail, name="detail"),
+]
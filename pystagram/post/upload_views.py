@@ -0,0 +1,248 @@
+import fcntl
+import hashlib
+import os
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from django.core.validators import validate_image_file_extension
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse, UnreadablePostError
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods, require_POST
+
+from post.forms import PostForm, PostImageForm
+from post.models import ChunkedUpload, Post, PostImage, post_image_delete_files
+
+# 이미지를 나눠서 올리고, 끊기면 이어서 올리는 API (ChunkedUpload, post/models.py)
+#
+# 1. POST   /upload/                  filename, size                  => 201 {"upload_id", "offset": 0, ...}
+# 2. PATCH  /upload/<upload_id>/      Upload-Offset 헤더 + 본문(조각)   => {"offset": 지금까지 받은 크기, ...}
+#    연결이 끊기면 GET /upload/<upload_id>/ 로 받은 크기(offset)를 확인하고 그 다음부터 다시 PATCH
+#    Upload-Offset 이 서버가 받은 크기와 다르면 409 (응답의 offset부터 다시)
+# 3. POST   /upload/attach/           content, upload_ids(여러개), post_pk(기존 포스트에 붙일 때)
+#    => 모두 다 받은 업로드만, 한 트랜잭션에서 포스트(+ 이미지들)를 만들고 업로드는 삭제
+# 유저마다 끝나지 않은 업로드는 CHUNKED_UPLOAD_MAX_OPEN 개까지 (넘으면 429, 붙이거나 취소하면 다시 만들 수 있음)
+#
+# 조각은 request.read()로 조금씩 읽어서 파일에 바로 씀 => 조각 크기와 상관없이 메모리를 쓰지 않음
+# 같은 업로드에 동시에 PATCH 하지 않도록 .part 파일에 fcntl 락
+# 쓰면서 sha256도 이어서 계산하고, 다 받으면 ChunkedUpload.sha256 에 저장 => 붙일 때 저장소가 파일을 다시 읽지 않음
+# 계산 중인 해시는 프로세스 메모리(_hashers)에 있으므로 다른 프로세스가 다음 조각을 받으면 받은 부분을 한번 다시 읽어서 계산
+
+READ_SIZE = 64 * 1024
+MAX_HASHERS = 1000 # 프로세스마다 기억하는 계산 중인 해시 수 (넘으면 오래된 것부터 버림)
+
+_hashers = {} # upload_id => (지금까지 해시한 크기, hashlib 객체)
+
+
+class UploadConflict(Exception):
+    pass
+
+
+# 다 받은 .part 파일을 업로드 파일처럼 사용
+# temporary_file_path 가 있으면 ImageField 검사(Pillow)가 내용을 메모리(BytesIO)로 읽지 않고 경로로 엶
+class AssembledUpload(UploadedFile):
+    def __init__(self, upload):
+        super().__init__(open(upload.path, "rb"), name=upload.filename, size=upload.size)
+        self.path = upload.path
+        self.sha256 = upload.sha256 or None
+
+    def temporary_file_path(self):
+        return str(self.path)
+
+    # 저장소에 저장할 때는 경로 없는 파일로 => FileSystemStorage가 .part 파일을 옮기지(move) 않고 복사
+    # (트랜잭션이 롤백되면 업로드는 남아 있으므로 .part 파일도 그대로 있어야 함)
+    def as_file(self):
+        file = File(self.file, name=self.name)
+        file.sha256 = self.sha256
+        return file
+
+
+# offset 까지 해시한 상태를 가져옴 (이 프로세스에 없으면 받은 부분을 읽어서 계산)
+def get_hasher(upload, file, offset):
+    state = _hashers.pop(upload.upload_id, None)
+    if state is not None and state[0] == offset:
+        return state[1]
+
+    hasher = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(partial(file.read, READ_SIZE), b""):
+        hasher.update(chunk)
+    return hasher
+
+
+def upload_status(upload):
+    offset = upload.get_offset()
+    return {
+        "upload_id": str(upload.upload_id),
+        "filename": upload.filename,
+        "size": upload.size,
+        "offset": offset,
+        "completed": offset == upload.size,
+    }
+
+
+def error(message, status=400, **extra):
+    return JsonResponse({"error": message, **extra}, status=status)
+
+
+@require_POST
+@login_required()
+def upload_create(request):
+    filename = os.path.basename(request.POST.get("filename", ""))
+    try:
+        size = int(request.POST.get("size", ""))
+        validate_image_file_extension(UploadedFile(name=filename))
+    except (ValueError, ValidationError):
+        return error("이미지 파일 이름과 크기를 확인해주세요.")
+    if not 0 < size <= settings.CHUNKED_UPLOAD_MAX_SIZE or len(filename) > 255:
+        return error("이미지 파일 이름과 크기를 확인해주세요.")
+    if ChunkedUpload.objects.filter(user=request.user).count() >= settings.CHUNKED_UPLOAD_MAX_OPEN:
+        return error("끝나지 않은 업로드가 너무 많습니다.", status=429)
+
+    upload = ChunkedUpload.objects.create(user=request.user, filename=filename, size=size)
+    upload.path.parent.mkdir(parents=True, exist_ok=True)
+    upload.path.touch()
+    return JsonResponse(upload_status(upload), status=201)
+
+
+@require_http_methods(["GET", "HEAD", "PATCH", "DELETE"])
+@login_required()
+def upload_detail(request, upload_id):
+    upload = get_object_or_404(ChunkedUpload, upload_id=upload_id, user=request.user)
+
+    if request.method == "PATCH":
+        return upload_append(request, upload)
+    if request.method == "DELETE": # 올리기 취소
+        upload.delete()
+        return HttpResponse(status=204)
+    return JsonResponse(upload_status(upload))
+
+
+def upload_append(request, upload):
+    try:
+        offset = int(request.headers["Upload-Offset"])
+        length = int(request.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return error("Upload-Offset, Content-Length 헤더가 필요합니다.")
+
+    try:
+        file = open(upload.path, "r+b")
+    except FileNotFoundError:
+        return error("업로드가 만료되었습니다.", status=404)
+
+    with file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return error("다른 요청이 이어서 올리는 중입니다.", status=409, **upload_status(upload))
+
+        if offset != os.fstat(file.fileno()).st_size:
+            return error("offset이 맞지 않습니다.", status=409, **upload_status(upload))
+        if offset + length > upload.size:
+            return error("전체 크기보다 많이 보낼 수 없습니다.", status=413, **upload_status(upload))
+
+        hasher = get_hasher(upload, file, offset)
+        file.seek(offset)
+        try:
+            for chunk in iter(partial(request.read, READ_SIZE), b""):
+                file.write(chunk)
+                hasher.update(chunk)
+        except UnreadablePostError:
+            pass # 중간에 끊긴 경우 : 받은 데이터까지는 저장 => 다음 PATCH는 그 다음부터
+
+        offset = file.tell()
+        if offset == upload.size:
+            upload.sha256 = hasher.hexdigest()
+            ChunkedUpload.objects.filter(pk=upload.pk).update(sha256=upload.sha256)
+        else:
+            if len(_hashers) >= MAX_HASHERS:
+                _hashers.pop(next(iter(_hashers)))
+            _hashers[upload.upload_id] = (offset, hasher)
+
+    return JsonResponse(upload_status(upload))
+
+
+# 다 받은 업로드들을 포스트 이미지로 붙임 (upload_ids 순서대로)
+# 이미지 검사(형식, 픽셀 수)는 PostCreateView 와 같은 PostImageForm 으로 저장 전에 모두 먼저 하고
+# 파일은 트랜잭션 밖에서 저장소에 먼저 저장 => 복사/해시 계산 동안 DB 쓰기 락을 잡고 있지 않음
+# 포스트/이미지 생성과 업로드 삭제는 한 트랜잭션 => 일부 이미지만 붙은 포스트가 생기지 않음
+# 미리보기/파생 이미지는 커밋된 다음 백그라운드에서 (PostImage.save)
+# 같은 업로드를 동시에 붙이면 업로드를 먼저 지운 요청만 진행, 나머지는 롤백하고 409
+# 실패하면 먼저 저장한 파일은 직접 삭제 (내용 기반 저장소에서는 참조 수 -1)
+@require_POST
+@login_required()
+def upload_attach(request):
+    try:
+        upload_ids = list(dict.fromkeys(uuid.UUID(upload_id) for upload_id in request.POST.getlist("upload_ids")))
+    except ValueError: # uuid 형식이 아닌 경우
+        return error("업로드를 찾을 수 없습니다.", status=404)
+    if not 0 < len(upload_ids) <= settings.CHUNKED_UPLOAD_MAX_FILES:
+        return error(f"이미지는 1~{settings.CHUNKED_UPLOAD_MAX_FILES}개까지 붙일 수 있습니다.")
+
+    uploads = ChunkedUpload.objects.in_bulk(upload_ids, field_name="upload_id")
+    uploads = [uploads.get(upload_id) for upload_id in upload_ids]
+    if any(upload is None or upload.user_id != request.user.pk for upload in uploads):
+        return error("업로드를 찾을 수 없습니다.", status=404)
+
+    incomplete = [str(upload.upload_id) for upload in uploads if upload.get_offset() != upload.size]
+    if incomplete:
+        return error("아직 다 올라가지 않은 이미지가 있습니다.", status=409, incomplete=incomplete)
+
+    post = None
+    post_form = None
+    if request.POST.get("post_pk"):
+        try:
+            post_pk = int(request.POST["post_pk"])
+        except ValueError:
+            return error("포스트를 찾을 수 없습니다.", status=404)
+        post = get_object_or_404(Post, pk=post_pk, user=request.user)
+    else:
+        post_form = PostForm(request.POST)
+        if not post_form.is_valid():
+            return error("본문을 확인해주세요.", errors=post_form.errors)
+
+    files = [AssembledUpload(upload) for upload in uploads]
+    post_images = []
+    attached = False
+    try:
+        image_forms = [PostImageForm(files={"image": file}) for file in files]
+        errors = {str(upload.upload_id): form.errors for upload, form in zip(uploads, image_forms) if not form.is_valid()}
+        if errors:
+            return error("이미지를 확인해주세요.", errors=errors)
+
+        for upload, file, image_form in zip(uploads, files, image_forms):
+            post_image = image_form.save(commit=False)
+            post_images.append(post_image)
+            post_image.image.save(upload.filename, file.as_file(), save=False) # 저장소에만 저장 (_committed = True)
+
+        with transaction.atomic():
+            # 임시 파일은 커밋된 다음에 삭제 (chunked_upload_delete_file)
+            _, deleted = ChunkedUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()
+            if deleted.get(ChunkedUpload._meta.label, 0) != len(uploads):
+                raise UploadConflict()
+
+            if post is None:
+                post = post_form.save(commit=False)
+                post.user = request.user
+                post.save()
+
+            for post_image in post_images:
+                post_image.post = post
+                post_image.save()
+        attached = True
+    except UploadConflict: # 다른 요청이 먼저 붙인 경우
+        return error("이미 붙인 업로드입니다.", status=409)
+    finally:
+        if not attached:
+            for post_image in post_images:
+                if post_image.image._committed: # 저장소에 저장까지 된 경우만
+                    post_image_delete_files(PostImage, post_image)
+        for file in files:
+            file.close()
+
+    return JsonResponse({"post_pk": post.pk}, status=201)
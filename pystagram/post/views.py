@@ -1,14 +1,27 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
 from django.http import HttpResponseRedirect, JsonResponse, Http404
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import ListView, CreateView, UpdateView
 
+from member.follow_graph import following_among
+from member.search import search_users
+from member.suggestions import get_follow_suggestions
 from post.forms import PostForm, PostImageFormSet, CommentForm
-from post.models import Post, Like
+from post.comment_views import comment_paginator
+from post.models import Post, Like, Tag, latest_comments_prefetch, normalize_tag, tag_page_cache_key
+from post.search import search_post_ids
+from post.tag_index import tag_index
+from post.timeline import get_timeline_page
+from post.trending import get_trending_tags, TRENDING_WINDOWS
+from utils.pagination import CursorPaginator, CursorPage
+from utils.search import make_snippet
 
 
 User = get_user_model()
@@ -16,17 +29,66 @@ User = get_user_model()
 # select_related : 1:N, 1:1 참조 컬럼 =>  “한쪽이 외래키로 참조하는 정방향 관계”
 # prefetch_related : 1:N 역참조 컬럼, N:M 컬럼 => “역참조나 다대다(M2M)”
 class PostListView(ListView):
-    queryset = Post.objects.all().select_related("user").prefetch_related("images", "comments", "likes")
+    comments_preview_size = 3 # 피드 카드마다 보여줄 최신 댓글 수
+    queryset = (Post.objects.all().select_related("user")
+                .prefetch_related("images", latest_comments_prefetch(comments_preview_size)))
     template_name = "post/list.html"
     paginate_by = 5
-    ordering = ("-created_at", )
+    ordering = ("-created_at", "-id")
+    cursor_paginate = True # 무한 스크롤은 커서 페이지네이션 사용
+
+    # ?page=N 으로 들어온 요청은 기존 offset 페이지네이션 그대로 처리
+    # 그 외에는 ?cursor=... 로 (created_at, id) 기준 다음 페이지를 가져옴 => COUNT(*), OFFSET 없음
+    def paginate_queryset(self, queryset, page_size):
+        # ?feed=following : 내가 팔로우 하는 사람들의 포스트만 (Timeline 테이블에서 읽음)
+        if self.get_feed() == "following":
+            page = get_timeline_page(self.request.user, queryset, page_size, self.request.GET.get("cursor"))
+            return None, page, page.object_list, page.has_next()
+
+        if not self.cursor_paginate or self.request.GET.get(self.page_kwarg):
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.ordering)
+        page = paginator.get_page(self.request.GET.get("cursor"))
+        return paginator, page, page.object_list, page.has_next()
+
+    def get_feed(self):
+        if self.request.user.is_authenticated and self.request.GET.get("feed") == "following":
+            return "following"
+        return "all"
 
     def get_context_data(self, *args, **kwargs):
         data = super().get_context_data(*args, **kwargs)
         data["comment_form"] = CommentForm()
+        data["feed"] = self.get_feed()
+        data["liked_post_ids"] = self.get_liked_post_ids(data["object_list"])
+        # 추천 위젯은 첫 페이지에만 (무한 스크롤로 가져오는 다음 페이지에서는 쿼리 X)
+        if not self.request.GET.get("cursor") and not self.request.GET.get(self.page_kwarg):
+            data["follow_suggestions"] = get_follow_suggestions(self.request.user)
+
+        # 미리보기보다 댓글이 많은 포스트는 "댓글 더보기"에서 이어서 가져올 커서를 만들어 둠
+        # comment_count는 유저 삭제(CASCADE) 등으로 실제 댓글 수보다 클 수 있으므로 미리보기가 비었으면 건너뜀
+        for post in data["object_list"]:
+            post.comments_cursor = None
+            if post.latest_comments and post.comment_count > len(post.latest_comments):
+                post.comments_cursor = comment_paginator(post.pk).encode_cursor(post.latest_comments[-1])
 
         return data
 
+    # 현재 페이지의 포스트 중 로그인한 유저가 좋아요 누른 포스트 id set
+    # 포스트마다 likes 전체를 가져와 비교하는 대신 WHERE post_id IN (...) 쿼리 한번으로 가져옴
+    # 템플릿에서는 post.pk in liked_post_ids => O(1)
+    def get_liked_post_ids(self, object_list):
+        if not self.request.user.is_authenticated:
+            return set()
+
+        return set(
+            Like.objects.filter(
+                user=self.request.user,
+                post_id__in=[post.pk for post in object_list],
+            ).values_list("post_id", flat=True)
+        )
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -84,12 +146,21 @@ def toggle_like(request):
     post = get_object_or_404(Post, pk=post_pk) # 해당 post를 가져오거나 없으면 404
     user = request.user # user는 로그인한 유저
 
-    like, created = Like.objects.get_or_create(user=user, post=post) # DB에 있으면 가져오고, 없으면 새로 만든다
+    # Like row 생성/삭제와 like_count 증감이 같이 반영되도록 하나의 트랜잭션으로 묶음
+    # F("like_count") + 1 : 파이썬에서 값을 읽어 더하는게 아니라 DB에서 UPDATE ... SET like_count = like_count + 1
+    with transaction.atomic():
+        like, created = Like.objects.get_or_create(user=user, post=post) # DB에 있으면 가져오고, 없으면 새로 만든다
+
+        if created: # 생성 됐으면(좋아요를 눌렀으면)
+            Post.objects.filter(pk=post.pk).update(like_count=F("like_count") + 1)
+        else:
+            like.delete() # 좋아요 삭제
+            Post.objects.filter(pk=post.pk, like_count__gt=0).update(like_count=F("like_count") - 1)
 
-    if not created: # 생성 됐으면(좋아요를 눌렀으면)
-        like.delete() # 좋아요 삭제
+    like_count = Post.objects.values_list("like_count", flat=True).get(pk=post.pk)
 
-    return JsonResponse({"created": created}) # like 생성 했으면(좋아요를 눌렀으면) True, 아닐경우 False
+    # like 생성 했으면(좋아요를 눌렀으면) True, 아닐경우 False
+    return JsonResponse({"created": created, "like_count": like_count})
 
 
 # 클래스 인스턴스(객체) 비유
@@ -103,20 +174,108 @@ def toggle_like(request):
 # “맛보기(is_valid)”, “냉장보관(save)”, “조각내기(forms)” 같은 일을 할 수 있다.
 
 
+USER_SEARCH_PAGE_SIZE = 20
+TAG_PAGE_SIZE = 18
+TAG_PAGE_CACHE_TIMEOUT = 60 * 10
+
+
+# 태그 검색 : 포스트 id 내림차순 커서 페이지네이션
+# 태그 id로 중간 테이블의 (tag_id, post_id) 인덱스를 역순으로 읽기 때문에 인기 태그도 정렬 없이 18개만 읽음
+# 가장 많이 보는 첫 페이지는 (포스트 id 목록, 다음 커서)만 캐시, 태그가 연결/해제되면 post_post_save에서 삭제
+# 포스트와 이미지는 요청마다 id로 다시 가져옴 => 이미지를 바꾸거나 지운 포스트도 지금 상태로 보여줌
+def get_tag_page(tag, cursor=None):
+    cache_key = tag_page_cache_key(tag)
+    if not cursor:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            post_ids, next_cursor = cached
+            posts = Post.objects.filter(pk__in=post_ids).prefetch_related("images").in_bulk()
+            return CursorPage([posts[pk] for pk in post_ids if pk in posts], next_cursor)
+
+    tag_id = Tag.objects.filter(tag=tag).values_list("id", flat=True).first()
+    queryset = Post.objects.filter(tags=tag_id).prefetch_related("images") if tag_id else Post.objects.none()
+
+    page = CursorPaginator(queryset, TAG_PAGE_SIZE, ("-id", )).get_page(cursor)
+    if not cursor:
+        cache.set(cache_key, ([post.pk for post in page], page.next_cursor), TAG_PAGE_CACHE_TIMEOUT)
+
+    return page
+
+
+POST_SEARCH_PAGE_SIZE = 10
+POST_SEARCH_MAX_PAGE = 50 # 관련도 순 결과는 앞쪽만 의미가 있으므로 500개까지만
+
+
+# 본문 전문 검색 : FTS5 색인에서 bm25 순으로 포스트 id를 가져온 뒤 그 순서대로 포스트를 채움
+def search_posts(q, page):
+    try:
+        page = min(max(int(page or 1), 1), POST_SEARCH_MAX_PAGE)
+    except ValueError:
+        raise Http404()
+
+    post_ids = search_post_ids(q, POST_SEARCH_PAGE_SIZE + 1, (page - 1) * POST_SEARCH_PAGE_SIZE)
+    has_next = len(post_ids) > POST_SEARCH_PAGE_SIZE and page < POST_SEARCH_MAX_PAGE
+    post_ids = post_ids[:POST_SEARCH_PAGE_SIZE]
+
+    posts = Post.objects.filter(pk__in=post_ids).select_related("user").prefetch_related("images").in_bulk()
+    object_list = [posts[pk] for pk in post_ids if pk in posts]
+    for post in object_list:
+        post.snippet = make_snippet(post.content, q)
+
+    page_obj = {
+        "number": page,
+        "has_previous": page > 1,
+        "has_next": has_next,
+    }
+    return object_list, page_obj
+
+
 def search(request):
-    search_type = request.GET.get("type") # user, tag
+    search_type = request.GET.get("type") # user, tag, post
     q = request.GET.get("q", '')
 
-    if search_type in ["user", "tag"] and q:
+    if search_type in ["user", "tag", "post"] and q:
+        page_obj = None
         if search_type == "user":
-            object_list = User.objects.filter(nickname__icontains=q)
+            # n-gram 인덱스로 찾고, id 순 커서 페이지네이션 (한번에 USER_SEARCH_PAGE_SIZE명까지만)
+            paginator = CursorPaginator(search_users(q), USER_SEARCH_PAGE_SIZE, ("id", ))
+            page_obj = paginator.get_page(request.GET.get("cursor"))
+            object_list = page_obj.object_list
+        elif search_type == "post":
+            object_list, page_obj = search_posts(q, request.GET.get("page"))
         else:
-            object_list = Post.objects.filter(tags__tag=q)
+            page_obj = get_tag_page(normalize_tag(q.lstrip("#")), request.GET.get("cursor"))
+            object_list = page_obj.object_list
 
         context = {
             "object_list" : object_list,
+            "page_obj": page_obj,
+            "trending_tags": get_trending_tags(),
         }
+        if search_type == "user":
+            # 검색 결과 중 내가 팔로우 하는 유저 (팔로우 그래프 캐시에서 한번에 확인)
+            context["following_ids"] = following_among(request.user, [user.pk for user in object_list])
 
         return render(request, f"search/search_{search_type}.html", context)
 
-    return render(request, "search/search.html")
+    return render(request, "search/search.html", {"trending_tags": get_trending_tags()})
+
+
+# 실시간 인기 태그 : /search/trending/?window=1h (또는 24h)
+def trending_tags(request):
+    window = request.GET.get("window", "1h")
+    if window not in TRENDING_WINDOWS:
+        raise Http404()
+
+    tags = [{"tag": tag, "count": count} for tag, count in get_trending_tags(window)]
+    return JsonResponse({"window": window, "tags": tags})
+
+
+# 해시태그 자동완성 : /search/tags/?q=py => py로 시작하는 태그를 포스트 수 순으로
+def tag_autocomplete(request):
+    q = normalize_tag(request.GET.get("q", "").strip().lstrip("#"))
+    if not q:
+        return JsonResponse({"tags": []})
+
+    tags = [{"tag": tag, "count": count} for tag, count in tag_index.complete(q)]
+    return JsonResponse({"tags": tags})
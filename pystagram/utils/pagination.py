@@ -0,0 +1,92 @@
+from django.core import signing
+from django.db.models import Q
+from django.http import Http404
+
+# 커서(keyset) 페이지네이션
+# OFFSET 방식은 N페이지를 보려면 앞의 모든 row를 읽고 버려야 하고, 매 페이지마다 COUNT(*)도 실행함
+# 커서 방식은 "마지막으로 본 row의 정렬 키(예: created_at, id)보다 뒤에 있는 row"만 인덱스로 바로 찾아감
+# => 10,000번째 페이지도 1페이지와 같은 속도, COUNT 쿼리 없음
+# 커서 값은 signing으로 서명해서 클라이언트가 임의로 조작하지 못하는 불투명한 문자열로 만듦
+
+CURSOR_SALT = "utils.pagination.cursor"
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    # ordering : 정렬 키, 마지막 필드는 반드시 유일한 값(id)이어야 같은 created_at끼리도 순서가 고정됨
+    def __init__(self, queryset, per_page, ordering=("-created_at", "-id")):
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = ordering
+        self.model = queryset.model
+
+    def _fields(self):
+        # ("-created_at", "-id") => [("created_at", True), ("id", True)] : (필드명, 내림차순 여부)
+        return [(field.lstrip("-"), field.startswith("-")) for field in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = [
+            self.model._meta.get_field(name).value_to_string(obj)
+            for name, _ in self._fields()
+        ]
+        return signing.dumps(values, salt=CURSOR_SALT)
+
+    def decode_cursor(self, cursor):
+        try:
+            values = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            raise Http404("잘못된 커서입니다.")
+
+        fields = self._fields()
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise Http404("잘못된 커서입니다.")
+
+        return [
+            self.model._meta.get_field(name).to_python(value)
+            for (name, _), value in zip(fields, values)
+        ]
+
+    # 커서 값(values) "다음"에 오는 row 조건 (다른 모델에 같은 키 공간의 커서를 적용할 때도 사용)
+    def after(self, values):
+        # (created_at, id) < (c, i) 를 풀어서 쓴 조건
+        # => created_at < c OR (created_at = c AND id < i)
+        fields = self._fields()
+        condition = Q()
+        for index, (name, desc) in enumerate(fields):
+            lookup = {f"{name}__{'lt' if desc else 'gt'}": values[index]}
+            for prev_index in range(index):
+                lookup[fields[prev_index][0]] = values[prev_index]
+            condition |= Q(**lookup)
+
+        # 첫 번째 키에 범위 조건(created_at <= c)을 한번 더 걸어줘야 DB가 인덱스 범위 스캔을 사용함
+        first_name, first_desc = fields[0]
+        first_range = Q(**{f"{first_name}__{'lte' if first_desc else 'gte'}": values[0]})
+        return first_range & condition
+
+    def get_page(self, cursor=None):
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+
+        # per_page + 1개를 가져와서 다음 페이지가 있는지 확인 (COUNT 쿼리 대신)
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+
+        return CursorPage(object_list, next_cursor)
@@ -0,0 +1,200 @@
+import fcntl
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path, PurePosixPath
+
+from PIL import Image, ImageOps
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.storage import default_storage
+from django.core.signing import Signer
+from django.http import Http404
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from utils.images import open_image
+from utils.media import send_file
+
+# 요청할 때 만드는 크기별 이미지 : /media/resize/<w>x<h>/<path>?s=<서명>
+#
+# 파생 이미지(variants, 썸네일)처럼 미리 정해둔 크기가 아니라 템플릿에서 필요한 크기를 그때그때 요청
+# - w x h : 그 크기로 가운데를 잘라서(crop) 채움, h = 0 이면 너비만 맞추고 비율 유지 (w = 0 이면 높이만)
+# - 서명(s) : 템플릿 태그(resize_url)로 만든 주소만 허용 => 아무 크기나 요청해서 서버에 렌더링/디스크를 쓰게 만들 수 없음
+# - 한번 만든 이미지는 settings.RESIZE_CACHE_DIR 에 저장하고 이후에는 파일만 내려줌
+#   캐시 전체 크기가 RESIZE_CACHE_MAX_BYTES 를 넘으면 가장 오래 안 쓴 파일(mtime)부터 지움 (LRU)
+# - 같은 이미지를 여러 요청이 동시에 처음 요청해도 fcntl 락으로 한 요청만 렌더링, 나머지는 기다렸다가 그 파일을 사용
+# - 원본 경로 + 크기 + 원본 버전(v)이 같으면 내용도 같으므로 브라우저/CDN이 1년 동안 캐시 (Cache-Control immutable)
+#   내용 기반 저장소 이름(sha256)은 내용이 바뀌면 이름도 바뀌므로 버전 없음
+#   날짜 경로 이름(예전 업로드)은 같은 이름으로 덮어쓰거나 지운 뒤 다시 쓸 수 있어서 원본 수정 시각(mtime)을 버전으로
+#   => 주소와 캐시 파일 이름에 버전이 들어가서 원본이 바뀌면 새 주소, 새 캐시 파일
+#   주소를 만든 뒤에 원본이 바뀌었으면(예전 버전 주소) 지금 원본으로 내려주고 캐시하지 않음 (no-cache)
+
+RESIZE_SALT = "utils.resize"
+RESIZE_MAX_SIZE = 2000
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+STALE_CACHE_CONTROL = "no-cache"
+TOUCH_SECONDS = 60 * 60 # 캐시 적중 시 mtime 갱신 간격 (매 요청마다 디스크에 쓰지 않도록)
+EVICT_SECONDS = 60 # 프로세스마다 캐시 크기를 다시 계산하는 최소 간격
+EVICT_RATIO = 0.9 # 한번 지울 때 최대 크기의 90%까지 줄임
+
+# post/3f/a2/3fa2...c9.jpg (utils/storage.py ContentAddressedStorage.hashed_name)
+HASHED_NAME_RE = re.compile(r"(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.\w+$")
+
+FORMATS = {
+    ".jpg": ("JPEG", "image/jpeg"),
+    ".jpeg": ("JPEG", "image/jpeg"),
+    ".png": ("PNG", "image/png"),
+    ".webp": ("WEBP", "image/webp"),
+    ".gif": ("PNG", "image/png"), # 움직이는 GIF는 첫 프레임만 PNG로
+}
+
+signer = Signer(salt=RESIZE_SALT)
+last_evicted_at = 0
+
+
+def sign(width, height, name, version=""):
+    return signer.signature(f"{width}x{height}/{name}?v={version}")
+
+
+# 원본 버전 : 내용 기반 저장소 이름은 "", 나머지는 원본 파일의 mtime (없는 파일은 "")
+def source_version(name):
+    if HASHED_NAME_RE.search(name):
+        return ""
+    try:
+        return format(os.stat(default_storage.path(name)).st_mtime_ns, "x")
+    except (OSError, SuspiciousFileOperation):
+        return ""
+
+
+# 템플릿 태그(resize_url)에서 사용 : 원본 파일 이름(FieldFile.name) => 크기별 이미지 주소
+def resize_url(name, width, height=0):
+    url = reverse("resize_image", kwargs={"width": width, "height": height, "path": name})
+    version = source_version(name)
+    if version:
+        return f"{url}?v={version}&s={sign(width, height, name, version)}"
+    return f"{url}?s={sign(width, height, name)}"
+
+
+def cache_path(width, height, name, version=""):
+    key = hashlib.sha256(f"{width}x{height}/{name}?v={version}".encode()).hexdigest()
+    extension = PurePosixPath(name).suffix.lower()
+    if extension == ".gif":
+        extension = ".png"
+    return Path(settings.RESIZE_CACHE_DIR, key[:2], f"{key}{extension}")
+
+
+def render(source_path, target_path, width, height):
+    image_format = FORMATS[target_path.suffix][0]
+    with open_image(source_path, (width, height)) as image:
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+        if width and height:
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width or RESIZE_MAX_SIZE, height or RESIZE_MAX_SIZE), Image.Resampling.LANCZOS)
+
+        # 임시 파일에 다 쓴 다음 이름을 바꿔서(os.replace) 다른 요청이 반쯤 쓴 파일을 읽지 않도록
+        # 인코딩/쓰기에 실패하면 임시 파일을 지움 (evict 는 .tmp 파일을 세지 않아서 계속 남음)
+        fd, temp_path = tempfile.mkstemp(dir=target_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                image.save(file, image_format)
+            os.replace(temp_path, target_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+# 같은 캐시 파일을 동시에 렌더링하지 않도록 락
+# 락 파일은 캐시 파일마다 만들지 않고 앞 2글자 디렉터리마다 하나(.lock, 256개)만 사용
+# 락을 얻은 다음에 다시 확인해서 먼저 끝난 요청이 만든 파일이 있으면 그대로 사용
+# 원본이 이미지가 아니거나 깨졌거나 화소 수(IMAGE_MAX_PIXELS)를 넘으면 500 대신 404
+def render_once(source_path, target_path, width, height):
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(target_path.parent / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not target_path.exists():
+            try:
+                render(source_path, target_path, width, height)
+            except (OSError, ValueError, ValidationError, Image.DecompressionBombError):
+                raise Http404("이미지를 열 수 없습니다.")
+            return True
+    return False
+
+
+# 캐시 디렉터리 전체 크기가 RESIZE_CACHE_MAX_BYTES 를 넘으면 mtime이 오래된 파일부터 삭제
+# 여러 프로세스가 동시에 정리하지 않도록 .evict.lock 을 non-blocking으로 잡은 프로세스만 실행
+def evict():
+    global last_evicted_at
+    if time.monotonic() - last_evicted_at < EVICT_SECONDS:
+        return
+    last_evicted_at = time.monotonic()
+
+    cache_dir = Path(settings.RESIZE_CACHE_DIR)
+    with open(cache_dir / ".evict.lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return
+
+        files = []
+        total = 0
+        for path in cache_dir.glob("*/*"):
+            if path.name.startswith(".") or path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= settings.RESIZE_CACHE_MAX_BYTES:
+            return
+
+        files.sort()
+        for _, size, path in files:
+            if total <= settings.RESIZE_CACHE_MAX_BYTES * EVICT_RATIO:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+@require_GET
+def resize_image(request, width, height, path):
+    version = request.GET.get("v", "")
+    if not constant_time_compare(request.GET.get("s", ""), sign(width, height, path, version)):
+        raise Http404("잘못된 서명입니다.")
+    if not (width or height) or width > RESIZE_MAX_SIZE or height > RESIZE_MAX_SIZE:
+        raise Http404("지원하지 않는 크기입니다.")
+    if PurePosixPath(path).suffix.lower() not in FORMATS:
+        raise Http404("지원하지 않는 형식입니다.")
+
+    try:
+        source_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404()
+    if not os.path.exists(source_path):
+        raise Http404()
+
+    current_version = source_version(path)
+    target_path = cache_path(width, height, path, current_version)
+    if target_path.exists():
+        # 적중한 파일은 mtime을 갱신해서 LRU 정리 대상에서 뒤로 보냄
+        if time.time() - target_path.stat().st_mtime > TOUCH_SECONDS:
+            os.utime(target_path)
+    elif render_once(source_path, target_path, width, height):
+        evict()
+
+    if not target_path.exists(): # 그 사이에 다른 프로세스의 캐시 정리로 지워진 경우
+        render_once(source_path, target_path, width, height)
+
+    # X-Accel-Redirect/X-Sendfile 위임, ETag/Range 처리는 media 파일과 같음 (utils/media.py)
+    cache_control = CACHE_CONTROL if version == current_version else STALE_CACHE_CONTROL
+    return send_file(request, str(target_path), FORMATS[target_path.suffix][1], cache_control)
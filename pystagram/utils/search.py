@@ -0,0 +1,70 @@
+import re
+
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# SQLite FTS5 전문 검색용 텍스트 처리
+#
+# FTS5 기본 토크나이저(unicode61)는 띄어쓰기 기준으로 단어를 나누기 때문에
+# 한글처럼 조사가 붙는 언어는 "맛집" 으로 "맛집투어를" 을 찾을 수 없음
+# => 한글은 두 글자씩 잘라서(bigram) 색인하고, 검색어도 같은 방식으로 잘라서 "연속된 bigram" 구문으로 검색
+# 예) "맛집투어를" => "맛집 집투 투어 어를", 검색어 "맛집투어" => "맛집 집투 투어" (phrase)
+# 영어/숫자는 단어 그대로 색인하고 검색어는 접두어 검색(python* )
+
+HANGUL = "가-힣"
+TOKEN_RE = re.compile(rf"[{HANGUL}]+|[^\W{HANGUL}]+")
+
+
+def bigrams(word):
+    if len(word) == 1:
+        return [word]
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def is_hangul(token):
+    return "가" <= token[0] <= "힣"
+
+
+# 색인할 텍스트 : 한글은 bigram으로 펼치고 나머지는 소문자 단어 그대로
+def to_search_text(text):
+    words = []
+    for token in TOKEN_RE.findall(text.lower()):
+        words.extend(bigrams(token) if is_hangul(token) else [token])
+    return " ".join(words)
+
+
+# 검색어 => FTS5 MATCH 구문 (토큰끼리는 AND)
+# 토큰은 \w 문자로만 이루어져 있어서 따옴표로 감싸면 FTS5 문법(OR, NEAR, * 등)이 끼어들 수 없음
+def to_match_query(q):
+    terms = []
+    for token in TOKEN_RE.findall(q.lower()):
+        if is_hangul(token) and len(token) > 1:
+            terms.append('"' + " ".join(bigrams(token)) + '"')
+        else:
+            terms.append(f'"{token}"*')
+    return " ".join(terms)
+
+
+# 원문에서 검색어가 처음 나오는 부분 앞뒤로 잘라서 검색어를 <mark>로 강조
+# 한글 bigram 색인 텍스트는 원문과 모양이 달라서 FTS5 snippet() 대신 원문으로 직접 만듦
+def make_snippet(text, q, size=80):
+    terms = sorted(set(TOKEN_RE.findall(q.lower())), key=len, reverse=True)
+    if not terms:
+        return escape(text[:size])
+
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(match.start() - size // 2, 0) if match else 0
+    snippet = text[start:start + size]
+
+    highlighted = []
+    last = 0
+    for found in pattern.finditer(snippet):
+        highlighted.append(escape(snippet[last:found.start()]))
+        highlighted.append(f"<mark>{escape(found.group())}</mark>")
+        last = found.end()
+    highlighted.append(escape(snippet[last:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + size < len(text) else ""
+    return mark_safe(prefix + "".join(highlighted) + suffix)
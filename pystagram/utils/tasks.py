@@ -0,0 +1,63 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 백그라운드 작업 실행 (저장이 커밋된 다음 transaction.on_commit 에서 enqueue 호출)
+#
+# settings.TASKS_WORKERS
+# - 0 (기본값) : 커밋된 다음 요청 안에서 바로 실행
+#   => 추가 프로세스가 DB(SQLite)에 동시에 쓰지 않고, 웹 서버가 재시작돼도 작업이 사라지지 않음
+# - 1 이상 : 웹 서버 프로세스마다 그 수만큼의 프로세스 풀로 넘기고 요청은 바로 응답
+#   풀에 쌓인 작업은 웹 서버가 재시작되면 사라지므로, 빠진 결과는 관리 커맨드로 다시 채움
+#   (build_placeholders, build_image_variants, rebuild_thumbnails)
+#
+# 프로세스 풀 : Pillow 작업처럼 CPU를 쓰는 작업이 있어서 스레드(GIL) 대신 프로세스
+# spawn : 부모 프로세스를 fork 하지 않고 새 파이썬을 띄움 (DB 연결, 스레드 상태를 물려받지 않음)
+#         => 워커가 처음 뜰 때 init_worker에서 django.setup() 한번 (병렬 관리 커맨드도 같이 사용)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+# reset=True : 워커가 비정상 종료되어 풀이 깨졌을 때(BrokenProcessPool) 새 풀로 교체
+def get_executor(reset=False):
+    global _executor
+    with _executor_lock:
+        if reset and _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.TASKS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            )
+    return _executor
+
+
+def log_error(future):
+    if future.exception() is not None:
+        logger.error("백그라운드 작업 실패", exc_info=future.exception())
+
+
+def enqueue(func, *args):
+    if not settings.TASKS_WORKERS:
+        func(*args)
+        return
+
+    try:
+        future = get_executor().submit(func, *args)
+    except BrokenProcessPool:
+        future = get_executor(reset=True).submit(func, *args)
+    future.add_done_callback(log_error)
@@ -0,0 +1,34 @@
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+# 업로드를 받는 동안 sha256 계산
+# 요청 본문에서 chunk가 들어올 때마다 해시를 갱신하고, 완성된 파일 객체에 file.sha256 으로 붙여둠
+# => 저장소(utils/storage.py)에서 해시를 위해 파일을 처음부터 다시 읽지 않음
+# settings.FILE_UPLOAD_HANDLERS 에 기본 핸들러 대신 등록
+
+
+class HashingUploadHandlerMixin:
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # 메모리 핸들러는 파일이 커서 사용하지 않는 경우(activated=False) 다음 핸들러로 넘기기만 함
+        if getattr(self, "activated", True):
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    pass